@@ -0,0 +1,243 @@
+#!/usr/bin/env -S python -B
+#
+# batchsim.py
+#
+# Copyright 2022 OTSUKI Takashi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+from argparse import ArgumentParser
+from typing import Dict, Optional
+
+import numpy as np
+
+from params import StrategyParams
+
+VILLAGER = 0
+SEER = 1
+MEDIUM = 2
+BODYGUARD = 3
+POSSESSED = 4
+WEREWOLF = 5
+ROLE_NAMES = ["VILLAGER", "SEER", "MEDIUM", "BODYGUARD", "POSSESSED", "WEREWOLF"]
+
+ROLE_LIST_5 = [VILLAGER, VILLAGER, SEER, POSSESSED, WEREWOLF]
+"""Roles of the standard 5-player game."""
+ROLE_LIST_15 = [VILLAGER] * 8 + [SEER, MEDIUM, BODYGUARD, POSSESSED, WEREWOLF, WEREWOLF, WEREWOLF]
+"""Roles of the standard 15-player game."""
+
+
+class BatchSimulation:
+    """Struct-of-arrays simulation of many independent games advanced together.
+
+    Every array has a leading game dimension. The role heuristics are vectorized versions of
+    the sample agents: villagers vote for the seers that reported them as werewolves,
+    the seer divines an undivined agent at random and votes for the werewolves it found,
+    the possessed and werewolves give fake judgements and vote for their fake werewolves,
+    and the werewolves attack an agent that did comingout.
+    Cross-game learning (strong agents, opponent model) is not modelled.
+    """
+
+    num_games: int
+    """The number of games."""
+    num_players: int
+    """The number of players in each game."""
+    roles: np.ndarray
+    """Role of each player (game x player)."""
+    alive: np.ndarray
+    """Whether each player is alive (game x player)."""
+    co: np.ndarray
+    """Whether each player has declared itself a seer (game x player)."""
+    accused: np.ndarray
+    """accused[g, s, t] is True if s has judged t as a werewolf (game x player x player)."""
+    judged: np.ndarray
+    """judged[g, s, t] is True if s has judged t (game x player x player)."""
+    winner: np.ndarray
+    """0 while running, 1 if the villagers won, 2 if the werewolves won (game)."""
+
+    def __init__(self, num_games: int, num_players: int = 5, params: Optional[StrategyParams] = None,
+                 seed: Optional[int] = None) -> None:
+        """Initialize a new instance of BatchSimulation.
+
+        Args:
+            num_games: The number of games.
+            num_players: 5 or 15.
+            params: Strategy parameters shared by all players.
+            seed: Random seed.
+        """
+        if num_players not in (5, 15):
+            raise ValueError("num_players must be 5 or 15")
+        self.num_games = num_games
+        self.num_players = num_players
+        self.params = params if params is not None else StrategyParams()
+        self.rng = np.random.default_rng(seed)
+        base: np.ndarray = np.array(ROLE_LIST_5 if num_players == 5 else ROLE_LIST_15, dtype=np.int8)
+        self.roles = self.rng.permuted(np.tile(base, (num_games, 1)), axis=1)
+        shape = (num_games, num_players)
+        self.alive = np.ones(shape, dtype=bool)
+        self.co = np.zeros(shape, dtype=bool)
+        self.accused = np.zeros(shape + (num_players,), dtype=bool)
+        self.judged = np.zeros(shape + (num_players,), dtype=bool)
+        self.winner = np.zeros(num_games, dtype=np.int8)
+        self.num_wolves = int((base == WEREWOLF).sum())
+        self._eye = np.eye(num_players, dtype=bool)[None]
+        self._games = np.arange(num_games)
+        # Werewolves pretend to be seers with the given probability in 15-player games.
+        fake_seer: np.ndarray = self.rng.random(shape) < self.params.werewolf_fake_seer_prob
+        self.is_wolf = self.roles == WEREWOLF
+        self.fake_seer = (self.roles == POSSESSED) | (self.is_wolf & fake_seer & (num_players != 5))
+        self.day = 0
+
+    def run(self, max_day: int = 20) -> np.ndarray:
+        """Play all games to the end.
+
+        Args:
+            max_day: The day on which unfinished games are stopped.
+
+        Returns:
+            The winner of each game (1: villagers, 2: werewolves).
+        """
+        self._night()  # Day 0: divination only.
+        for self.day in range(1, max_day + 1):
+            if self.winner.all():
+                break
+            self._morning()
+            self._execute()
+            self._judge_end()
+            self._night()
+            self._judge_end()
+        running: np.ndarray = self.winner == 0
+        self.winner[running] = np.where((self.alive & self.is_wolf).any(axis=1), 2, 1)[running]
+        return self.winner
+
+    def _running(self) -> np.ndarray:
+        return self.winner == 0
+
+    def _choose(self, mask: np.ndarray) -> np.ndarray:
+        """Choose uniformly among True entries of the last axis; -1 where there is none."""
+        keys: np.ndarray = self.rng.random(mask.shape) * mask
+        choice: np.ndarray = keys.argmax(axis=-1)
+        return np.where(mask.any(axis=-1), choice, -1)
+
+    def _morning(self) -> None:
+        p: StrategyParams = self.params
+        running: np.ndarray = self._running()[:, None]
+        # Fake judgements of the possessed and of the werewolves pretending to be seers.
+        faker: np.ndarray = self.fake_seer & self.alive & running
+        targets: np.ndarray = self._choose(self.alive[:, None, :] & ~self.judged & ~self._eye)
+        valid: np.ndarray = faker & (targets >= 0)
+        g, s = np.nonzero(valid)
+        t = targets[g, s]
+        found: np.ndarray = self.accused[g, s].sum(axis=-1) < self.num_wolves
+        prob: np.ndarray = np.where(self.roles[g, s] == POSSESSED, p.possessed_fake_wolf_prob,
+                                    p.werewolf_fake_wolf_prob)
+        human_target: np.ndarray = (self.roles[g, s] == POSSESSED) | ~self.is_wolf[g, t]
+        self.judged[g, s, t] = True
+        self.accused[g, s, t] = found & human_target & (self.rng.random(len(g)) < prob)
+        # Comingout on the scheduled day or when a werewolf is found.
+        has_wolf: np.ndarray = self.accused.any(axis=-1)
+        co_date: np.ndarray = np.where(self.roles == SEER, p.seer_co_date, p.possessed_co_date)
+        claims: np.ndarray = (self.roles == SEER) | self.fake_seer
+        self.co |= claims & self.alive & running & ((self.day >= co_date) | has_wolf)
+
+    def _execute(self) -> None:
+        alive: np.ndarray = self.alive
+        others: np.ndarray = alive[:, None, :] & ~self._eye
+        reports: np.ndarray = self.accused & self.co[:, :, None]  # Reports visible to everyone.
+        accusers: np.ndarray = np.swapaxes(reports, 1, 2)  # accusers[g, v, s]: s reported v.
+        claimants: np.ndarray = (self.co & alive)[:, None, :] & ~self._eye
+        # Villagers, bodyguards and mediums: the fake seers that reported me as a werewolf,
+        # or the targets reported by the other seers (mediums).
+        human: np.ndarray = accusers & alive[:, None, :]
+        non_fake: np.ndarray = self.co[:, None, :] & ~accusers  # non_fake[g, v, s]: s did not accuse v.
+        trusted: np.ndarray = (non_fake.astype(np.int16) @ reports.astype(np.int16)) > 0
+        medium: np.ndarray = np.where(trusted.any(axis=-1, keepdims=True), trusted & others, human)
+        # The seer, the possessed and the werewolves: my (fake) werewolves, or the rival seers.
+        liar: np.ndarray = self.accused & others
+        liar = np.where(liar.any(axis=-1, keepdims=True), liar, claimants)
+        role: np.ndarray = self.roles[:, :, None]
+        candidates: np.ndarray = np.where(role == MEDIUM, medium, human)
+        candidates = np.where((role == SEER) | self.fake_seer[:, :, None], liar, candidates)
+        candidates = np.where(candidates.any(axis=-1, keepdims=True), candidates, others)
+        votes: np.ndarray = self._choose(candidates)
+        votes[~alive] = -1
+        tally: np.ndarray = np.zeros((self.num_games, self.num_players + 1), dtype=np.int16)
+        np.add.at(tally, (np.repeat(self._games, self.num_players), votes.ravel()), 1)
+        tally = tally[:, :-1]  # Drop the votes of the dead (-1).
+        executed: np.ndarray = self._choose(tally == tally.max(axis=1, keepdims=True))
+        running: np.ndarray = self._running()
+        self.alive[self._games[running], executed[running]] = False
+
+    def _night(self) -> None:
+        running: np.ndarray = self._running()
+        alive: np.ndarray = self.alive
+        # Divination of an undivined agent by the seer.
+        seer: np.ndarray = self.roles == SEER
+        seer_alive: np.ndarray = (seer & alive).any(axis=1) & running
+        seer_idx: np.ndarray = seer.argmax(axis=1)
+        undivined: np.ndarray = alive & ~self.judged[self._games, seer_idx] & ~seer
+        target: np.ndarray = self._choose(undivined)
+        g: np.ndarray = self._games[seer_alive & (target >= 0)]
+        self.judged[g, seer_idx[g], target[g]] = True
+        self.accused[g, seer_idx[g], target[g]] = self.is_wolf[g, target[g]]
+        if self.day == 0:
+            return
+        # Guard one of the alive seers that did comingout.
+        guard: np.ndarray = self.roles == BODYGUARD
+        guard_alive: np.ndarray = (guard & alive).any(axis=1)
+        guarded: np.ndarray = self._choose(self.co & alive & ~guard)
+        guarded[~guard_alive] = -1
+        # Attack one of the alive humans that did comingout, or any alive human.
+        humans: np.ndarray = alive & ~self.is_wolf
+        preferred: np.ndarray = humans & self.co
+        attacked: np.ndarray = self._choose(np.where(preferred.any(axis=1, keepdims=True), preferred, humans))
+        g = self._games[running & (attacked >= 0) & (attacked != guarded)]
+        self.alive[g, attacked[g]] = False
+
+    def _judge_end(self) -> None:
+        running: np.ndarray = self._running()
+        wolves: np.ndarray = (self.alive & self.is_wolf).sum(axis=1)
+        humans: np.ndarray = (self.alive & ~self.is_wolf).sum(axis=1)
+        self.winner[running & (wolves == 0)] = 1
+        self.winner[running & (wolves > 0) & (wolves >= humans)] = 2
+
+    def win_rates(self) -> Dict[str, float]:
+        """Return the win rate of each role over the finished games."""
+        villagers_won: np.ndarray = (self.winner == 1)[:, None]
+        wolf_side: np.ndarray = (self.roles == WEREWOLF) | (self.roles == POSSESSED)
+        won: np.ndarray = np.where(wolf_side, ~villagers_won, villagers_won)
+        return {name: float(won[self.roles == r].mean())
+                for r, name in enumerate(ROLE_NAMES) if (self.roles == r).any()}
+
+
+def main() -> None:
+    parser: ArgumentParser = ArgumentParser(description="Estimate win rates with batched simulation.")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--players", type=int, default=5, choices=[5, 15])
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--set", type=str, action="append", default=[],
+                        help="strategy parameter override, e.g. --set seer_co_date=1")
+    args = parser.parse_args()
+    overrides: Dict[str, str] = dict(s.split("=", 1) for s in args.set)
+    start: float = time.perf_counter()
+    sim: BatchSimulation = BatchSimulation(args.games, args.players, StrategyParams(**overrides), args.seed)
+    winner: np.ndarray = sim.run()
+    elapsed: float = time.perf_counter() - start
+    print(f"{args.games} games in {elapsed:.2f}s, villagers win {(winner == 1).mean():.3f}")
+    for name, rate in sim.win_rates().items():
+        print(f"  {name:10s} {rate:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env -S python -B
+#
+# bench_packet.py
+#
+# Copyright 2022 OTSUKI Takashi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import random
+import time
+from argparse import ArgumentParser
+from typing import List
+
+from aiwolf import GameInfo
+
+from packet import PacketDecoder
+from simulator import LocalGame
+
+TEXTS: List[str] = ["Skip", "Over", "COMINGOUT Agent[{a:02d}] SEER", "VOTE Agent[{a:02d}]",
+                    "DIVINED Agent[{a:02d}] HUMAN", "ESTIMATE Agent[{a:02d}] WEREWOLF"]
+
+
+def day_packets(player_num: int, turns: int, seed: int) -> List[str]:
+    """Return the TALK packets sent to Agent[01] during one day, each with the whole talk list."""
+    rng: random.Random = random.Random(seed)
+    game: LocalGame = LocalGame([None] * player_num, rng=rng)  # type: ignore
+    game.day = 1
+    packets: List[str] = []
+    for turn in range(turns):
+        for agent in range(1, player_num + 1):
+            text: str = rng.choice(TEXTS).format(a=rng.randint(1, player_num))
+            game.talks.append({"idx": len(game.talks), "day": 1, "turn": turn, "agent": agent, "text": text})
+            packet = {"request": "TALK", "gameInfo": game.game_info_packet(1), "gameSetting": None,
+                      "talkHistory": None, "whisperHistory": None}
+            packets.append(json.dumps(packet, separators=(",", ":")))
+    return packets
+
+
+def main() -> None:
+    parser: ArgumentParser = ArgumentParser(description="Compare full and delta decoding of talk lists.")
+    parser.add_argument("--players", type=int, default=15)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    packets: List[str] = day_packets(args.players, args.turns, args.seed)
+    total_bytes: int = sum(len(p) for p in packets)
+
+    start: float = time.perf_counter()
+    full_talks: int = 0
+    for line in packets:
+        game_info: GameInfo = GameInfo(json.loads(line)["gameInfo"])
+        full_talks += len(game_info.talk_list)
+    full_time: float = time.perf_counter() - start
+
+    decoder: PacketDecoder = PacketDecoder()
+    start = time.perf_counter()
+    for line in packets:
+        decoder.decode(line)
+    delta_time: float = time.perf_counter() - start
+    stats = decoder.stats()
+
+    print(f"{len(packets)} packets, {total_bytes} bytes, talk lists {stats['bytes_total']} bytes")
+    print(f"full : talk bytes parsed {stats['bytes_total']:10d}  Talk objects {full_talks:8d}  "
+          f"{full_time * 1000:8.1f} ms")
+    print(f"delta: talk bytes parsed {stats['bytes_parsed']:10d}  Talk objects {stats['talks_built']:8d}  "
+          f"{delta_time * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env -S python -B
+#
+# bench_scaling.py
+#
+# Copyright 2022 OTSUKI Takashi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+import sys
+from argparse import ArgumentParser
+from typing import Dict, List
+
+import numpy as np
+
+from sample import SamplePlayer
+from simulator import LocalGame
+from timed import TimedPlayer
+
+
+def measure(player_num: int, games: int, turns: int, seed: int) -> Dict[str, float]:
+    """Return the mean time per call (in microseconds) of each callback in games of the given size."""
+    random.seed(seed)
+    rng: random.Random = random.Random(seed)
+    players: List[TimedPlayer] = [TimedPlayer(SamplePlayer()) for _ in range(player_num)]
+    for _ in range(games):
+        LocalGame(players, rng=rng, max_talk_turn=turns).run()
+    seconds: Dict[str, float] = {}
+    calls: Dict[str, int] = {}
+    for p in players:
+        for name in p.samples:
+            seconds[name] = seconds.get(name, 0.0) + p.seconds(name)
+            calls[name] = calls.get(name, 0) + p.calls(name)
+    result: Dict[str, float] = {name: seconds[name] / calls[name] * 1e6 for name in sorted(seconds)}
+    result["all"] = sum(seconds.values()) / sum(calls.values()) * 1e6
+    return result
+
+
+def main() -> None:
+    parser: ArgumentParser = ArgumentParser(description="Measure per-callback cost against the number of players.")
+    parser.add_argument("--sizes", type=str, default="5,15,30,60")
+    parser.add_argument("--games", type=int, default=3)
+    parser.add_argument("--turns", type=int, default=5, help="talk turns per day")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-slope", type=float, default=1.2,
+                        help="fail if the log-log slope of the mean cost exceeds this")
+    args = parser.parse_args()
+
+    sizes: List[int] = [int(s) for s in args.sizes.split(",")]
+    rows: List[Dict[str, float]] = [measure(n, args.games, args.turns, args.seed) for n in sizes]
+    names: List[str] = sorted({k for r in rows for k in r if k != "all"}) + ["all"]
+    print("players " + " ".join(f"{n:>11s}" for n in names) + "   (us/call)")
+    for n, row in zip(sizes, rows):
+        print(f"{n:7d} " + " ".join(f"{row.get(k, float('nan')):11.1f}" for k in names))
+    slope: float = float(np.polyfit(np.log(sizes), np.log([r["all"] for r in rows]), 1)[0])
+    print(f"log-log slope of the mean cost per callback: {slope:.2f}")
+    if slope > args.max_slope:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
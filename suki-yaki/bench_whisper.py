@@ -0,0 +1,110 @@
+#!/usr/bin/env -S python -B
+#
+# bench_whisper.py
+#
+# Copyright 2022 OTSUKI Takashi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+from argparse import ArgumentParser
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from aiwolf import Agent, Content, Role, Topic
+
+from sample import SamplePlayer
+from simulator import LocalGame
+
+
+class ConsensusGame(LocalGame):
+    """LocalGame recording how fast the werewolves agree on the target of attack."""
+
+    rounds: List[Optional[int]]
+    """Whisper turns until every alive werewolf declared the same target (None if never) on each night."""
+    splits: List[bool]
+    """Whether the attack votes of each night were split."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.rounds = []
+        self.splits = []
+        self._attack_votes: Optional[List[int]] = None
+
+    def _talk(self, log: List[Dict[str, Any]], speakers: List[int], request) -> None:
+        super()._talk(log, speakers, request)
+        if log is not self.whispers or self.day == 0:
+            return
+        declared: Dict[int, int] = {}
+        agreed: Optional[int] = None
+        for w in log:
+            content: Content = Content.compile(w["text"])
+            if content.topic == Topic.ATTACK:
+                declared[w["agent"]] = content.target.agent_idx
+            if len(declared) == len(speakers) and len(set(declared.values())) == 1:
+                agreed = w["turn"] + 1
+                break
+        self.rounds.append(agreed)
+
+    def _night(self) -> None:
+        self._attack_votes = [] if len(self._alive_wolves()) > 1 else None
+        super()._night()
+        if self._attack_votes:
+            self.splits.append(len(set(self._attack_votes)) > 1)
+        self._attack_votes = None
+
+    def _request(self, i: int, request) -> Any:
+        result: Any = super()._request(i, request)
+        if self._attack_votes is not None and self.roles[i] == Role.WEREWOLF and isinstance(result, Agent):
+            self._attack_votes.append(result.agent_idx)
+        return result
+
+
+def measure(games: int, player_num: int, follow: bool, seed: int) -> Dict[str, float]:
+    """Play games and return the statistics of the werewolves' agreement."""
+    random.seed(seed)
+    rng: random.Random = random.Random(seed)
+    players: List[SamplePlayer] = [SamplePlayer() for _ in range(player_num)]
+    for p in players:
+        p.werewolf.follow_consensus = follow
+    rounds: List[Optional[int]] = []
+    splits: List[bool] = []
+    for _ in range(games):
+        game: ConsensusGame = ConsensusGame(players, rng=rng)
+        game.run()
+        rounds.extend(game.rounds)
+        splits.extend(game.splits)
+    agreed: np.ndarray = np.array([r for r in rounds if r is not None], dtype=float)
+    return {"nights": len(rounds),
+            "agreed": len(agreed) / len(rounds) if rounds else float("nan"),
+            "mean_rounds": float(agreed.mean()) if len(agreed) else float("nan"),
+            "p95_rounds": float(np.percentile(agreed, 95)) if len(agreed) else float("nan"),
+            "split_attacks": float(np.mean(splits)) if splits else float("nan")}
+
+
+def main() -> None:
+    parser: ArgumentParser = ArgumentParser(description="Measure whisper rounds until the werewolves agree.")
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--players", type=int, default=15)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'':10s} {'nights':>7s} {'agreed':>7s} {'mean':>6s} {'p95':>6s} {'split':>7s}")
+    for name, follow in (("consensus", True), ("baseline", False)):
+        r: Dict[str, float] = measure(args.games, args.players, follow, args.seed)
+        print(f"{name:10s} {r['nights']:7d} {r['agreed']:7.1%} {r['mean_rounds']:6.2f} "
+              f"{r['p95_rounds']:6.1f} {r['split_attacks']:7.1%}")
+
+
+if __name__ == "__main__":
+    main()
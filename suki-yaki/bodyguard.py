@@ -38,7 +38,8 @@ class SampleBodyguard(SampleVillager):
         super().initialize(game_info, game_setting)
         self.to_be_guarded = AGENT_NONE
 
-    def guard(self) -> Agent:
+    def guard_candidates(self) -> List[Agent]:
+        """Return the candidates for guard."""
         # Guard one of the alive non-fake seers.
         candidates: List[Agent] = self.get_alive([j.agent for j in self.divination_reports
                                                   if j.result != Species.WEREWOLF or j.target != self.me])
@@ -46,6 +47,10 @@ class SampleBodyguard(SampleVillager):
         if not candidates:
             candidates = [a for a in self.comingout_map if self.is_alive(a)
                           and self.comingout_map[a] == Role.MEDIUM]
+        return candidates
+
+    def guard(self) -> Agent:
+        candidates: List[Agent] = self.cached("guard", self.guard_candidates)
         # Guard one of the alive sagents if there are no candidates.
         # Update a guard candidate if the candidate is changed.
         if self.to_be_guarded == AGENT_NONE or self.to_be_guarded not in candidates:
@@ -0,0 +1,215 @@
+#!/usr/bin/env -S python -B
+#
+# calibration.py
+#
+# Copyright 2022 OTSUKI Takashi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from argparse import ArgumentParser
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from aiwolf import Agent, Role
+
+from opponent import ROLES
+
+EPS: float = 1e-6
+"""Probabilities are clipped to [EPS, 1 - EPS] for the log-loss."""
+
+# Statistics accumulated in each bin of a reliability curve.
+S_COUNT = 0
+S_PREDICTED = 1  # Sum of the predicted probabilities.
+S_OBSERVED = 2  # The number of agents that actually had the role.
+NUM_STATS = 3
+
+
+class BeliefCalibration:
+    """Scores of the belief matrix against the roles revealed at the end of each game.
+
+    The matrix is snapshotted at every day_start. When the game ends, all snapshots are
+    scored at once (Brier score and log-loss of each role), and binned into reliability
+    curves. The last `window` games are kept in ring buffers of fixed size.
+    """
+
+    window: int
+    """The number of games kept."""
+    bins: int
+    """The number of bins of a reliability curve."""
+    num_games: int
+    """The number of games scored."""
+    scores: np.ndarray
+    """Brier score, log-loss and the number of predictions (game x role x 3)."""
+    curves: np.ndarray
+    """Reliability statistics (game x role x bin x NUM_STATS)."""
+    latest: Optional[np.ndarray]
+    """Scores of the last game (role x 3), None if the current game has not been scored."""
+
+    def __init__(self, window: int = 1000, bins: int = 10) -> None:
+        """Initialize a new instance of BeliefCalibration.
+
+        Args:
+            window: The number of games kept.
+            bins: The number of bins of a reliability curve.
+        """
+        self.window = window
+        self.bins = bins
+        self.num_games = 0
+        self.scores = np.zeros((window, len(ROLES), 3), dtype=np.float32)
+        self.curves = np.zeros((window, len(ROLES), bins, NUM_STATS), dtype=np.float32)
+        self.latest = None
+        self._snapshots: List[np.ndarray] = []
+        self._agents: List[Agent] = []
+        self._columns: np.ndarray = np.zeros(0, dtype=int)
+
+    def start_game(self) -> None:
+        """Forget the snapshots of the previous game."""
+        self.latest = None
+        self._snapshots = []
+        self._agents = []
+
+    def snapshot(self, prob: pd.DataFrame) -> None:
+        """Record the belief matrix of the current day.
+
+        Args:
+            prob: The belief matrix (agent x role). Dead agents are NaN.
+        """
+        if not self._snapshots:
+            self._agents = list(prob.index)
+            self._columns = np.array([ROLES.index(r) if r in ROLES else -1 for r in prob.columns])
+        self._snapshots.append(prob.to_numpy(dtype=float, copy=True))
+
+    def score(self, role_map: Dict[Agent, Role], exclude: Optional[List[Agent]] = None) -> Optional[np.ndarray]:
+        """Score the snapshots of the game that has just finished.
+
+        Args:
+            role_map: Roles of all agents.
+            exclude: Agents not scored (e.g. me).
+
+        Returns:
+            Brier score, log-loss and the number of predictions of each role (role x 3),
+            or None if there is nothing to score.
+        """
+        if not self._snapshots or not role_map:
+            return None
+        known: List[bool] = [a in role_map and (exclude is None or a not in exclude) for a in self._agents]
+        if not any(known):
+            return None
+        rows: np.ndarray = np.flatnonzero(known)
+        columns: np.ndarray = np.flatnonzero(self._columns >= 0)
+        # Days x agents x roles.
+        p: np.ndarray = np.stack(self._snapshots)[:, rows][:, :, columns]
+        target: np.ndarray = self._columns[columns]
+        truth: np.ndarray = np.array([ROLES.index(role_map[self._agents[i]])
+                                      if role_map[self._agents[i]] in ROLES else -1 for i in rows])
+        y: np.ndarray = np.broadcast_to((truth[:, None] == target[None, :]).astype(float), p.shape)
+        valid: np.ndarray = ~np.isnan(p)
+        p = np.where(valid, p, 0.0)
+        clipped: np.ndarray = np.clip(p, EPS, 1 - EPS)
+        brier: np.ndarray = np.where(valid, (p - y) ** 2, 0.0)
+        log_loss: np.ndarray = np.where(valid, -(y * np.log(clipped) + (1 - y) * np.log(1 - clipped)), 0.0)
+        n: np.ndarray = valid.sum(axis=(0, 1))
+
+        slot: int = self.num_games % self.window
+        result: np.ndarray = np.zeros((len(ROLES), 3), dtype=np.float32)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result[target, 0] = brier.sum(axis=(0, 1)) / n
+            result[target, 1] = log_loss.sum(axis=(0, 1)) / n
+        result[target, 2] = n
+        self.scores[slot] = np.nan_to_num(result)
+
+        # Bin every valid prediction, with the role as the major index.
+        b: np.ndarray = np.clip((p * self.bins).astype(int), 0, self.bins - 1)
+        flat: np.ndarray = (np.broadcast_to(target, p.shape) * self.bins + b)[valid]
+        size: int = len(ROLES) * self.bins
+        curve: np.ndarray = np.stack([np.bincount(flat, minlength=size),
+                                      np.bincount(flat, weights=p[valid], minlength=size),
+                                      np.bincount(flat, weights=y[valid], minlength=size)], axis=-1)
+        self.curves[slot] = curve.reshape(len(ROLES), self.bins, NUM_STATS)
+        self.num_games += 1
+        self._snapshots = []
+        self.latest = self.scores[slot]
+        return self.latest
+
+    def _kept(self) -> slice:
+        return slice(0, min(self.num_games, self.window))
+
+    def summary(self) -> pd.DataFrame:
+        """Return the mean Brier score and log-loss of each role over the kept games."""
+        s: np.ndarray = self.scores[self._kept()]
+        n: np.ndarray = s[:, :, 2].sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            brier: np.ndarray = (s[:, :, 0] * s[:, :, 2]).sum(axis=0) / n
+            log_loss: np.ndarray = (s[:, :, 1] * s[:, :, 2]).sum(axis=0) / n
+        return pd.DataFrame({"role": [r.name for r in ROLES], "brier": brier, "log_loss": log_loss,
+                             "predictions": n.astype(int)})
+
+    def reliability(self) -> pd.DataFrame:
+        """Return the reliability curve of each role over the kept games.
+
+        Each row is a bin: the mean predicted probability and the observed frequency
+        of the role among the predictions in the bin.
+        """
+        c: np.ndarray = self.curves[self._kept()].sum(axis=0)
+        count: np.ndarray = c[:, :, S_COUNT]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            predicted: np.ndarray = c[:, :, S_PREDICTED] / count
+            observed: np.ndarray = c[:, :, S_OBSERVED] / count
+        edges: np.ndarray = np.arange(self.bins) / self.bins
+        return pd.DataFrame({"role": np.repeat([r.name for r in ROLES], self.bins),
+                             "bin_low": np.tile(edges, len(ROLES)),
+                             "predicted": predicted.ravel(), "observed": observed.ravel(),
+                             "count": count.ravel().astype(int)})
+
+    def export(self, path: str) -> None:
+        """Save the kept games to a .npz file.
+
+        Args:
+            path: The file to write.
+        """
+        np.savez_compressed(path, scores=self.scores, curves=self.curves, num_games=self.num_games,
+                            roles=np.array([r.value for r in ROLES]))
+
+    def load(self, path: str) -> None:
+        """Restore the games saved by export.
+
+        Args:
+            path: The file to read.
+        """
+        with np.load(path) as data:
+            self.scores = data["scores"].copy()
+            self.curves = data["curves"].copy()
+            self.num_games = int(data["num_games"])
+        self.window, _, self.bins, _ = self.curves.shape
+
+
+def main() -> None:
+    parser: ArgumentParser = ArgumentParser(description="Show the calibration of the belief matrix.")
+    parser.add_argument("path", type=str, help=".npz file saved by BeliefCalibration.export")
+    parser.add_argument("--curves", type=str, default=None, help="CSV file to write the reliability curves")
+    args = parser.parse_args()
+
+    calibration: BeliefCalibration = BeliefCalibration()
+    calibration.load(args.path)
+    print(f"{min(calibration.num_games, calibration.window)} games")
+    print(calibration.summary().to_string(index=False))
+    curves: pd.DataFrame = calibration.reliability()
+    if args.curves is not None:
+        curves.to_csv(args.curves, index=False)
+    else:
+        print(curves[curves["count"] > 0].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
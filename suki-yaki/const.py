@@ -20,3 +20,8 @@ from aiwolf import Content, Judge, SkipContentBuilder
 CONTENT_SKIP: Content = Content(SkipContentBuilder())
 
 JUDGE_EMPTY: Judge = Judge()
+
+VILLAGERS: str = "villagers"
+"""The village side."""
+WEREWOLVES: str = "werewolves"
+"""The werewolf side."""
@@ -0,0 +1,294 @@
+#
+# constraint.py
+#
+# Copyright 2022 OTSUKI Takashi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Dict, List, Optional, Set
+
+import pandas as pd
+from aiwolf import Agent, Judge, Role, Species
+from aiwolf.constant import AGENT_NONE
+
+LYING_ROLES: List[Role] = [Role.WEREWOLF, Role.POSSESSED]
+"""Roles that can make false comingouts and false judgements."""
+
+
+class ConstraintEngine:
+    """Incremental derivation of hard facts from comingouts, judgements and deaths.
+
+    Every event touches only the agents it is about (and the claimants of the same role),
+    so the cost of an update does not depend on the length of the talk history.
+    Derived facts are written to the belief matrix as soon as they are found.
+    """
+
+    me: Agent
+    """Myself."""
+    my_role: Role
+    """My role."""
+    role_num_map: Dict[Role, int]
+    """The number of each role in the current game."""
+    prob: Optional[pd.DataFrame]
+    """Belief matrix (agent x role) to which derived facts are propagated."""
+    claims: Dict[Role, List[Agent]]
+    """Agents that declared themselves each role."""
+    claimed_role: Dict[Agent, Role]
+    """The latest role declared by each agent."""
+    judgements: Dict[Agent, List[Judge]]
+    """Divination/identification reports indexed by their target."""
+    liars: Set[Agent]
+    """Agents that must be lying (and so are werewolves or possessed)."""
+    humans: Set[Agent]
+    """Agents that must be human."""
+    wolves: Set[Agent]
+    """Agents that must be werewolves."""
+    executed: Set[Agent]
+    """Agents that were executed."""
+    forced_liars: int
+    """Lower bound on the number of liars implied by the known facts."""
+    forced_wolves: int
+    """Lower bound on the number of werewolves among the liars."""
+    saturated: bool
+    """Whether all liars are accounted for, so that everyone else is on the village side."""
+
+    def __init__(self) -> None:
+        """Initialize a new instance of ConstraintEngine."""
+        self.me = AGENT_NONE
+        self.my_role = Role.UNC
+        self.role_num_map = {}
+        self.prob = None
+        self.claims = {}
+        self.claimed_role = {}
+        self.judgements = {}
+        self.liars = set()
+        self.humans = set()
+        self.wolves = set()
+        self.executed = set()
+        self.forced_liars = 0
+        self.forced_wolves = 0
+        self.saturated = False
+        self._excess = {}
+        self._free_liars = 0
+
+    def initialize(self, me: Agent, role_map: Dict[Agent, Role], role_num_map: Dict[Role, int],
+                   prob: pd.DataFrame) -> None:
+        """Reset the engine for a new game.
+
+        Args:
+            me: Myself.
+            role_map: Roles known at the start of the game (mine, and my allies' if I am a werewolf).
+            role_num_map: The number of each role in the game.
+            prob: The belief matrix to which derived facts are propagated.
+        """
+        self.me = me
+        self.my_role = role_map[me]
+        self.role_num_map = role_num_map
+        self.prob = prob
+        self.claims.clear()
+        self.claimed_role.clear()
+        self.judgements.clear()
+        self.liars.clear()
+        self.humans.clear()
+        self.wolves.clear()
+        self.executed.clear()
+        self.forced_liars = 0
+        self.forced_wolves = 0
+        self.saturated = False
+        self._excess.clear()
+        self._free_liars = 0
+        for agent, role in role_map.items():
+            if role == Role.WEREWOLF:
+                self.wolves.add(agent)
+            else:
+                self.humans.add(agent)
+
+    @property
+    def num_liars(self) -> int:
+        """The number of agents that can lie in this game."""
+        return sum(self.role_num_map.get(r, 0) for r in LYING_ROLES)
+
+    def comingout(self, agent: Agent, role: Role) -> None:
+        """Process a COMINGOUT.
+
+        Args:
+            agent: The agent that did comingout.
+            role: The role declared.
+        """
+        if agent == self.me or self.claimed_role.get(agent) == role:
+            return
+        previous: Optional[Role] = self.claimed_role.get(agent)
+        if previous is not None:
+            self.claims[previous].remove(agent)
+            self._recount(previous)
+            # Revealing a special role after claiming to be a villager is how hidden roles come out,
+            # but changing a special role means one of the two declarations is false.
+            if previous != Role.VILLAGER:
+                self._mark_liar(agent)
+        elif agent in self.liars:
+            self._free_liars -= 1  # Now counted among the claimants.
+        self.claimed_role[agent] = role
+        claimants: List[Agent] = self.claims.setdefault(role, [])
+        claimants.append(agent)
+        if role == self.my_role and self.role_num_map.get(role, 0) <= 1:
+            self._mark_liar(agent)
+        elif agent in self.wolves and role != Role.WEREWOLF:
+            self._mark_liar(agent)
+        elif role not in self.role_num_map or self.role_num_map[role] == 0:
+            self._mark_liar(agent)
+        self._recount(role)
+
+    def divined(self, judge: Judge) -> None:
+        """Process a DIVINED report.
+
+        Args:
+            judge: The reported divination.
+        """
+        self._judged(judge)
+
+    def identified(self, judge: Judge) -> None:
+        """Process an IDENTIFIED report.
+
+        Args:
+            judge: The reported identification.
+        """
+        # A medium can only identify an executed agent.
+        if judge.target not in self.executed:
+            self._mark_liar(judge.agent)
+        self._judged(judge)
+
+    def attacked(self, agent: Agent) -> None:
+        """Process an agent killed by the werewolves.
+
+        Args:
+            agent: The agent attacked.
+        """
+        # Werewolves cannot attack werewolves.
+        self._mark_human(agent)
+
+    def executed_agent(self, agent: Agent) -> None:
+        """Process an executed agent.
+
+        Args:
+            agent: The agent executed.
+        """
+        self.executed.add(agent)
+
+    def learned(self, agent: Agent, species: Species) -> None:
+        """Process my own divination or identification result.
+
+        Args:
+            agent: The agent judged.
+            species: Its species.
+        """
+        if species == Species.HUMAN:
+            self._mark_human(agent)
+        elif agent not in self.wolves:
+            self.wolves.add(agent)
+            for judge in self.judgements.get(agent, []):
+                if self._contradicts(judge):
+                    self._mark_liar(judge.agent)
+
+    def is_liar(self, agent: Agent) -> bool:
+        """Return whether the agent must be lying."""
+        return agent in self.liars
+
+    def _judged(self, judge: Judge) -> None:
+        self.judgements.setdefault(judge.target, []).append(judge)
+        if self._contradicts(judge):
+            self._mark_liar(judge.agent)
+
+    def _contradicts(self, judge: Judge) -> bool:
+        if judge.result == Species.WEREWOLF:
+            return judge.target in self.humans
+        return judge.target in self.wolves
+
+    def _recount(self, role: Role) -> None:
+        """Update the lower bound on the number of liars from the claimants of the role."""
+        claimants: List[Agent] = self.claims.get(role, [])
+        excess: int = max(len(claimants) - self.role_num_map.get(role, 0),
+                          sum(1 for a in claimants if a in self.liars))
+        self.forced_liars += excess - self._excess.get(role, 0)
+        self._excess[role] = excess
+        self._update_forced()
+
+    def _update_forced(self) -> None:
+        total: int = self.forced_liars + self._free_liars
+        self.forced_wolves = max(0, total - self.role_num_map.get(Role.POSSESSED, 0))
+        known_wolves: int = len(self.liars) - self.role_num_map.get(Role.POSSESSED, 0)
+        if known_wolves > 0:
+            # At least known_wolves of the known liars are werewolves.
+            lower: float = known_wolves / len(self.liars)
+            for liar in self.liars:
+                if liar not in self.humans:
+                    self._raise(liar, Role.WEREWOLF, lower)
+        if not self.saturated and self.num_liars > 0 and total >= self.num_liars:
+            self.saturated = True
+            self._propagate_saturation()
+
+    def _propagate_saturation(self) -> None:
+        """Mark everyone outside the liar pool as a villager-side agent (runs once per game)."""
+        pool: Set[Agent] = set(self.liars)
+        for role, excess in self._excess.items():
+            if excess > 0:
+                pool.update(self.claims[role])
+        if self.prob is None:
+            return
+        for agent in self.prob.index:
+            if agent not in pool and agent != self.me:
+                self._mark_human(agent)
+                self._set(agent, Role.POSSESSED, 0.0)
+
+    def _mark_liar(self, agent: Agent) -> None:
+        if agent in self.liars or agent == self.me:
+            return
+        self.liars.add(agent)
+        claimed: Optional[Role] = self.claimed_role.get(agent)
+        if claimed is None or claimed not in self.claims:
+            self._free_liars += 1
+        if self.prob is not None:
+            for role in self.prob.columns:
+                if role not in LYING_ROLES:
+                    self._set(agent, role, 0.0)
+        if agent in self.humans:
+            # A lying human must be possessed.
+            self._set(agent, Role.POSSESSED, 1.0)
+        if claimed is not None and claimed in self.claims:
+            self._recount(claimed)
+        else:
+            self._update_forced()
+
+    def _mark_human(self, agent: Agent) -> None:
+        if agent in self.humans:
+            return
+        self.humans.add(agent)
+        self._set(agent, Role.WEREWOLF, 0.0)
+        if agent in self.liars:
+            self._set(agent, Role.POSSESSED, 1.0)
+        # Re-check only the judgements about this agent.
+        for judge in self.judgements.get(agent, []):
+            if self._contradicts(judge):
+                self._mark_liar(judge.agent)
+
+    def _writable(self, agent: Agent, role: Role) -> bool:
+        # Rows of dead agents are NaN and stay so.
+        return self.prob is not None and agent != self.me and role in self.prob.columns \
+            and not pd.isna(self.prob.at[agent, role])
+
+    def _set(self, agent: Agent, role: Role, value: float) -> None:
+        if self._writable(agent, role):
+            self.prob.at[agent, role] = value
+
+    def _raise(self, agent: Agent, role: Role, value: float) -> None:
+        if self._writable(agent, role) and self.prob.at[agent, role] < value:
+            self.prob.at[agent, role] = value
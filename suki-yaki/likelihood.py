@@ -0,0 +1,174 @@
+#
+# likelihood.py
+#
+# Copyright 2022 OTSUKI Takashi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Dict, List
+
+import numpy as np
+from aiwolf import Agent, Content, Role, Species, Topic
+
+# Log-likelihood ratios (werewolf vs. human) of each piece of evidence.
+W_CLAIM = 0.4  # Claimed a role that someone else (not me) also claims.
+W_ACCUSED_BY_REAL = 3.0  # Judged as a werewolf by a probable real seer/medium.
+W_CLEARED_BY_REAL = -3.0  # Judged as human by a probable real seer/medium.
+W_COVERED_BY_WOLF = 1.2  # Judged as human by a probable werewolf.
+W_ACCUSED_BY_WOLF = -1.2  # Judged as a werewolf by a probable werewolf.
+W_AGAINST_REAL = 1.0  # Voted for a probable real seer/medium.
+W_AGAINST_WOLF = -0.8  # Voted for a probable werewolf.
+W_ATTACKED = -20.0  # Attacked at night.
+ITERATIONS = 3
+"""Rounds of propagation between the credibility of the claimants and the scores."""
+
+
+class WolfLikelihood:
+    """Probability of each agent being a werewolf, seen from the possessed.
+
+    The evidence is kept as matrices (agent x agent) of votes and judgements,
+    updated in O(1) per talk. The scores are recomputed lazily with a few matrix-vector
+    products, in which agents that look like werewolves make their judgements
+    and the real seer/medium make theirs informative.
+    """
+
+    index: Dict[Agent, int]
+    """Mapping between an agent and its row in the matrices."""
+    version: int
+    """Incremented whenever the evidence changes."""
+
+    def __init__(self) -> None:
+        """Initialize a new instance of WolfLikelihood."""
+        self.index = {}
+        self.version = 0
+        self._agents: List[Agent] = []
+        self._prior = 0.0
+        self._prior_p = 0.0
+        self._me = -1
+        self._start(0)
+
+    def _start(self, n: int) -> None:
+        self._votes = np.zeros((n, n))  # [i, j]: i declared/cast votes for j.
+        self._accuse = np.zeros((n, n))  # [i, j]: i judged j as a werewolf.
+        self._clear = np.zeros((n, n))  # [i, j]: i judged j as human.
+        self._claims = np.zeros(n)  # Whether each agent claimed seer or medium.
+        self._attacked = np.zeros(n)
+        self._roles: Dict[int, Role] = {}
+        self._scores = np.zeros(n)
+        self._dirty = True
+
+    def start_game(self, agents: List[Agent], me: Agent, num_wolves: int) -> None:
+        """Reset the evidence for a new game.
+
+        Args:
+            agents: All agents.
+            me: Myself (the possessed).
+            num_wolves: The number of werewolves.
+        """
+        self._agents = list(agents)
+        self.index = {a: i for i, a in enumerate(self._agents)}
+        self._me = self.index.get(me, -1)
+        p: float = min(max(num_wolves / max(len(agents) - 1, 1), 1e-3), 1 - 1e-3)
+        self._prior = float(np.log(p / (1 - p)))
+        self._prior_p = p
+        self._start(len(self._agents))
+        self.version += 1
+
+    def observe(self, talker: Agent, content: Content) -> None:
+        """Update the evidence with a talk.
+
+        Args:
+            talker: The agent that talked.
+            content: The content of the talk.
+        """
+        i = self.index.get(talker)
+        if i is None:
+            return
+        if content.topic == Topic.COMINGOUT and content.role in (Role.SEER, Role.MEDIUM):
+            self._claims[i] = 1.0
+            self._roles[i] = content.role
+        elif content.topic in (Topic.DIVINED, Topic.IDENTIFIED):
+            j = self.index.get(content.target)
+            if j is None:
+                return
+            (self._accuse if content.result == Species.WEREWOLF else self._clear)[i, j] = 1.0
+        elif content.topic == Topic.VOTE:
+            self.voted(talker, content.target)
+            return
+        else:
+            return
+        self._changed()
+
+    def voted(self, agent: Agent, target: Agent) -> None:
+        """Update the evidence with a (declared or cast) vote."""
+        i, j = self.index.get(agent), self.index.get(target)
+        if i is not None and j is not None and self._votes[i, j] == 0.0:
+            self._votes[i, j] = 1.0
+            self._changed()
+
+    def attacked(self, agent: Agent) -> None:
+        """Update the evidence with an agent attacked at night."""
+        i = self.index.get(agent)
+        if i is not None and self._attacked[i] == 0.0:
+            self._attacked[i] = 1.0
+            self._changed()
+
+    def probabilities(self) -> np.ndarray:
+        """Return the probability of each agent (in the order of the agent list) being a werewolf."""
+        if self._dirty:
+            self._scores = self._compute()
+            self._dirty = False
+        return self._scores
+
+    def probability(self, agent: Agent) -> float:
+        """Return the probability of the agent being a werewolf."""
+        i = self.index.get(agent)
+        return float(self.probabilities()[i]) if i is not None else 0.0
+
+    def likely_wolves(self, candidates: List[Agent], k: int) -> List[Agent]:
+        """Return at most k candidates more likely than the prior to be werewolves, more likely first."""
+        p: np.ndarray = self.probabilities()
+        likely: List[Agent] = [a for a in candidates if a in self.index and p[self.index[a]] > self._prior_p]
+        ranked: List[Agent] = sorted(likely, key=lambda a: -p[self.index[a]])
+        return ranked[:k]
+
+    def _changed(self) -> None:
+        self._dirty = True
+        self.version += 1
+
+    def _compute(self) -> np.ndarray:
+        n: int = len(self._agents)
+        if n == 0:
+            return self._scores
+        # Claimants of a role claimed by someone else besides me are suspicious.
+        others: np.ndarray = self._claims.copy()
+        if 0 <= self._me < n:
+            others[self._me] = 0.0
+        duplicate: np.ndarray = np.zeros(n)
+        for role in (Role.SEER, Role.MEDIUM):
+            mask: np.ndarray = np.array([self._roles.get(i) == role for i in range(n)], dtype=float) * others
+            if mask.sum() > 1:
+                duplicate += mask
+        base: np.ndarray = self._prior + W_CLAIM * duplicate + W_ATTACKED * self._attacked
+        p: np.ndarray = 1.0 / (1.0 + np.exp(-base))
+        for _ in range(ITERATIONS):
+            # Probability that each agent is a real seer/medium making true judgements.
+            real: np.ndarray = others * np.maximum(1.0 - p, self._attacked)
+            logit: np.ndarray = base \
+                + W_ACCUSED_BY_REAL * (real @ self._accuse) + W_CLEARED_BY_REAL * (real @ self._clear) \
+                + W_COVERED_BY_WOLF * (p @ self._clear) + W_ACCUSED_BY_WOLF * (p @ self._accuse) \
+                + W_AGAINST_REAL * (self._votes @ real) + W_AGAINST_WOLF * (self._votes @ p)
+            p = 1.0 / (1.0 + np.exp(-np.clip(logit, -30.0, 30.0)))
+        if 0 <= self._me < n:
+            p[self._me] = 0.0
+        return p
@@ -49,7 +49,7 @@ class SampleMedium(SampleVillager):
 
     def initialize(self, game_info: GameInfo, game_setting: GameSetting) -> None:
         super().initialize(game_info, game_setting)
-        self.co_date = 3
+        self.co_date = self.params.medium_co_date
         self.found_wolf = False
         self.has_co = False
         self.my_judge_queue.clear()
@@ -60,6 +60,7 @@ class SampleMedium(SampleVillager):
         judge: Optional[Judge] = self.game_info.medium_result
         if judge is not None:
             self.my_judge_queue.append(judge)
+            self.constraint.learned(judge.target, judge.result)
             if judge.result == Species.WEREWOLF:
                 self.found_wolf = True
                 self.prob.at[judge.target, Role.WEREWOLF] = 1
@@ -73,6 +74,24 @@ class SampleMedium(SampleVillager):
         if self.has_co and self.my_judge_queue:
             judge: Judge = self.my_judge_queue.popleft()
             return Content(IdentContentBuilder(judge.target, judge.result))
+        candidates: List[Agent] = self.cached("medium_vote", self.medium_candidates)
+        # Vote for one of the alive agents if there are no candidates.
+        # Declare which to vote for if not declare yet or the candidate is changed.
+        if self.vote_candidate == AGENT_NONE or self.vote_candidate not in candidates:
+            if candidates:
+                self.vote_candidate = self.random_select(candidates)
+            else:
+                if self.strong_vote:
+                    self.vote_candidate = self.strong_vote[-1]
+                else:
+                    self.vote_candite = self.strong_agent_w
+
+            if self.vote_candidate != AGENT_NONE:
+                return Content(VoteContentBuilder(self.vote_candidate))
+        return CONTENT_SKIP
+
+    def medium_candidates(self) -> List[Agent]:
+        """Return the candidates for voting."""
         # Fake seers.
         fake_seers: List[Agent] = [j.agent for j in self.divination_reports
                                    if j.target == self.me and j.result == Species.WEREWOLF]
@@ -88,17 +107,4 @@ class SampleMedium(SampleVillager):
         # Vote for one of the alive fake seers if there are no candidates.
         if not candidates:
             candidates = self.get_alive(fake_seers)
-        # Vote for one of the alive agents if there are no candidates.
-        # Declare which to vote for if not declare yet or the candidate is changed.
-        if self.vote_candidate == AGENT_NONE or self.vote_candidate not in candidates:
-            if candidates:
-                self.vote_candidate = self.random_select(candidates)
-            else:
-                if self.strong_vote:
-                    self.vote_candidate = self.strong_vote[-1]
-                else:
-                    self.vote_candite = self.strong_agent_w
-
-            if self.vote_candidate != AGENT_NONE:
-                return Content(VoteContentBuilder(self.vote_candidate))
-        return CONTENT_SKIP
+        return candidates
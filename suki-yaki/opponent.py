@@ -0,0 +1,217 @@
+#
+# opponent.py
+#
+# Copyright 2022 OTSUKI Takashi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Dict, List
+
+import numpy as np
+from aiwolf import Agent, Content, Role, Species, Topic
+
+ROLES: List[Role] = [Role.VILLAGER, Role.SEER, Role.MEDIUM, Role.BODYGUARD, Role.WEREWOLF, Role.POSSESSED]
+"""Roles predicted by the model (columns of the output)."""
+
+CO_ROLES: List[Role] = [Role.VILLAGER, Role.SEER, Role.MEDIUM, Role.BODYGUARD, Role.WEREWOLF, Role.POSSESSED]
+"""Roles whose comingout is a feature."""
+
+F_BIAS = 0
+F_CO = 1  # One-hot of the declared role, len(CO_ROLES) columns.
+F_CO_EARLY = F_CO + len(CO_ROLES)
+F_DIVINED_WOLF = F_CO_EARLY + 1
+F_DIVINED_HUMAN = F_DIVINED_WOLF + 1
+F_IDENTIFIED_WOLF = F_DIVINED_HUMAN + 1
+F_IDENTIFIED_HUMAN = F_IDENTIFIED_WOLF + 1
+F_VOTE = F_IDENTIFIED_HUMAN + 1
+F_VOTE_CHANGE = F_VOTE + 1
+F_ACCUSED = F_VOTE_CHANGE + 1
+F_VOTED = F_ACCUSED + 1
+F_ATTACKED = F_VOTED + 1
+F_EXECUTED = F_ATTACKED + 1
+NUM_FEATURES = F_EXECUTED + 1
+COUNT_FEATURES = slice(F_DIVINED_WOLF, F_ATTACKED)
+"""Features holding raw counts, which are squashed with log1p."""
+
+
+class OpponentModel:
+    """Online multinomial logistic regression predicting each agent's role from its behaviour.
+
+    Features are accumulated incrementally from talks during a game,
+    and the weights are updated by SGD from the revealed roles when the game ends.
+    The weights persist across games as long as the instance lives.
+    """
+
+    weights: np.ndarray
+    """Weight matrix (feature x role)."""
+    learning_rate: float
+    """Step size of SGD."""
+    l2: float
+    """L2 regularization strength."""
+    epochs: int
+    """The number of gradient steps per finished game."""
+    num_games: int
+    """The number of games trained on."""
+    features: np.ndarray
+    """Raw features (agent x feature) of the current game."""
+    index: Dict[Agent, int]
+    """Mapping between an agent and its row in features."""
+
+    def __init__(self, learning_rate: float = 0.1, l2: float = 1e-3, epochs: int = 5) -> None:
+        """Initialize a new instance of OpponentModel.
+
+        Args:
+            learning_rate: Step size of SGD.
+            l2: L2 regularization strength.
+            epochs: The number of gradient steps per finished game.
+        """
+        self.weights = np.zeros((NUM_FEATURES, len(ROLES)))
+        self.learning_rate = learning_rate
+        self.l2 = l2
+        self.epochs = epochs
+        self.num_games = 0
+        self.features = np.zeros((0, NUM_FEATURES))
+        self.index = {}
+        self._last_vote = {}
+
+    @property
+    def trained(self) -> bool:
+        """Whether the model has been trained on at least one game."""
+        return self.num_games > 0
+
+    def start_game(self, agent_list: List[Agent]) -> None:
+        """Clear the features for a new game.
+
+        Args:
+            agent_list: The agents of the game.
+        """
+        self.index = {a: i for i, a in enumerate(agent_list)}
+        self.features = np.zeros((len(agent_list), NUM_FEATURES))
+        self.features[:, F_BIAS] = 1.0
+        self._last_vote.clear()
+
+    def observe(self, talker: Agent, day: int, content: Content) -> None:
+        """Accumulate the features implied by a talk.
+
+        Args:
+            talker: The agent that talked.
+            day: The day of the talk.
+            content: The compiled content of the talk.
+        """
+        row = self.index.get(talker)
+        if row is None:
+            return
+        f: np.ndarray = self.features[row]
+        topic: Topic = content.topic
+        if topic == Topic.COMINGOUT:
+            if content.role in CO_ROLES:
+                f[F_CO:F_CO + len(CO_ROLES)] = 0.0
+                f[F_CO + CO_ROLES.index(content.role)] = 1.0
+                f[F_CO_EARLY] = 1.0 / (1.0 + day)
+        elif topic == Topic.DIVINED:
+            f[F_DIVINED_WOLF if content.result == Species.WEREWOLF else F_DIVINED_HUMAN] += 1
+            if content.result == Species.WEREWOLF:
+                self._add(content.target, F_ACCUSED)
+        elif topic == Topic.IDENTIFIED:
+            f[F_IDENTIFIED_WOLF if content.result == Species.WEREWOLF else F_IDENTIFIED_HUMAN] += 1
+        elif topic == Topic.VOTE:
+            f[F_VOTE] += 1
+            last = self._last_vote.get(talker)
+            if last is not None and last[0] == day and last[1] != content.target:
+                f[F_VOTE_CHANGE] += 1
+            self._last_vote[talker] = (day, content.target)
+            self._add(content.target, F_VOTED)
+
+    def died(self, agent: Agent, attacked: bool) -> None:
+        """Record the death of an agent.
+
+        Args:
+            agent: The dead agent.
+            attacked: True if killed by the werewolves, False if executed.
+        """
+        self._add(agent, F_ATTACKED if attacked else F_EXECUTED)
+
+    def predict(self) -> np.ndarray:
+        """Return the predicted role distribution (agent x role) in the order of ROLES."""
+        logits: np.ndarray = self._design() @ self.weights
+        logits -= logits.max(axis=1, keepdims=True)
+        p: np.ndarray = np.exp(logits)
+        return p / p.sum(axis=1, keepdims=True)
+
+    def wolf_probability(self, agent: Agent) -> float:
+        """Return the predicted probability that the agent is a werewolf."""
+        row = self.index.get(agent)
+        if row is None:
+            return 0.0
+        return float(self.predict()[row, ROLES.index(Role.WEREWOLF)])
+
+    def most_likely_wolf(self, candidates: List[Agent]) -> Agent:
+        """Return the candidate with the highest predicted probability of being a werewolf."""
+        wolf: np.ndarray = self.predict()[:, ROLES.index(Role.WEREWOLF)]
+        return max(candidates, key=lambda a: wolf[self.index[a]] if a in self.index else 0.0)
+
+    def fit(self, role_map: Dict[Agent, Role], exclude: List[Agent]) -> None:
+        """Update the weights from the roles revealed at the end of a game.
+
+        Args:
+            role_map: The revealed roles.
+            exclude: Agents not to learn from (e.g. myself).
+        """
+        rows: List[int] = []
+        cols: List[int] = []
+        for agent, role in role_map.items():
+            if agent in self.index and agent not in exclude and role in ROLES:
+                rows.append(self.index[agent])
+                cols.append(ROLES.index(role))
+        if not rows:
+            return
+        x: np.ndarray = self._design()[rows]
+        y: np.ndarray = np.zeros((len(rows), len(ROLES)))
+        y[np.arange(len(rows)), cols] = 1.0
+        for _ in range(self.epochs):
+            logits: np.ndarray = x @ self.weights
+            logits -= logits.max(axis=1, keepdims=True)
+            p: np.ndarray = np.exp(logits)
+            p /= p.sum(axis=1, keepdims=True)
+            grad: np.ndarray = x.T @ (p - y) / len(rows) + self.l2 * self.weights
+            self.weights -= self.learning_rate * grad
+        self.num_games += 1
+
+    def export(self, path: str) -> None:
+        """Save the model state to a .npz file.
+
+        Args:
+            path: The file to write.
+        """
+        np.savez(path, weights=self.weights, num_games=self.num_games,
+                 roles=np.array([r.value for r in ROLES]))
+
+    def load(self, path: str) -> None:
+        """Restore the model state saved by export.
+
+        Args:
+            path: The file to read.
+        """
+        with np.load(path) as data:
+            self.weights = data["weights"].copy()
+            self.num_games = int(data["num_games"])
+
+    def _design(self) -> np.ndarray:
+        x: np.ndarray = self.features.copy()
+        x[:, COUNT_FEATURES] = np.log1p(x[:, COUNT_FEATURES])
+        return x
+
+    def _add(self, agent: Agent, feature: int) -> None:
+        row = self.index.get(agent)
+        if row is not None:
+            self.features[row, feature] += 1
@@ -0,0 +1,244 @@
+#
+# packet.py
+#
+# Copyright 2022 OTSUKI Takashi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import socket
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiwolf import AbstractPlayer, Agent, GameInfo, GameSetting, Talk
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+
+
+class TalkChannel:
+    """Talks (or whispers) of the current day decoded so far.
+
+    The server resends the whole list of the day in every packet. The part of the list
+    already seen is recognized by comparing the raw JSON text with the previous packet,
+    and only the new tail is decoded into Talk objects; the old ones are reused.
+    """
+
+    talks: List[Talk]
+    """Talks of the current day."""
+    raw: str
+    """JSON text of the list decoded so far, without the closing bracket."""
+    bytes_total: int
+    """Bytes of talk lists received."""
+    bytes_parsed: int
+    """Bytes of talk lists actually decoded."""
+    talks_built: int
+    """Talk objects constructed."""
+    talks_reused: int
+    """Talk objects reused from previous packets."""
+
+    def __init__(self) -> None:
+        """Initialize a new instance of TalkChannel."""
+        self.talks = []
+        self.raw = ""
+        self.bytes_total = 0
+        self.bytes_parsed = 0
+        self.talks_built = 0
+        self.talks_reused = 0
+        self._last: Tuple[int, int] = (-1, -1)
+
+    def reset(self) -> None:
+        """Forget the talks of the previous day."""
+        self.talks = []
+        self.raw = ""
+        self._last = (-1, -1)
+
+    def decode_list(self, line: str, start: int) -> int:
+        """Decode the JSON array of talks starting at line[start] (the opening bracket).
+
+        Args:
+            line: The packet.
+            start: Index of the opening bracket of the array.
+
+        Returns:
+            Index just after the closing bracket.
+        """
+        reused: int = len(self.talks)
+        if self.raw and line.startswith(self.raw, start):
+            i: int = start + len(self.raw)
+        else:
+            self.reset()
+            reused = 0
+            i = start + 1
+        parsed_from: int = i
+        while True:
+            while line[i] in _WHITESPACE or line[i] == ",":
+                i += 1
+            if line[i] == "]":
+                break
+            obj, i = _DECODER.raw_decode(line, i)
+            self._append(obj)
+        self.raw = line[start:i]
+        self.bytes_total += i + 1 - start
+        self.bytes_parsed += i + 1 - parsed_from
+        self.talks_reused += reused
+        return i + 1
+
+    def extend(self, history: List[Dict[str, Any]]) -> None:
+        """Append talks sent as a delta (talkHistory/whisperHistory), skipping ones already seen.
+
+        Args:
+            history: Talks in server format.
+        """
+        for obj in history:
+            key: Tuple[int, int] = (obj["day"], obj["idx"])
+            if key[0] != self._last[0]:
+                self.reset()
+            if key > self._last:
+                self._append(obj)
+
+    def _append(self, obj: Dict[str, Any]) -> None:
+        self.talks.append(Talk.compile(obj))
+        self._last = (obj["day"], obj["idx"])
+        self.talks_built += 1
+
+
+class PacketDecoder:
+    """Decoder of server packets that reuses the talks and whispers decoded from earlier packets."""
+
+    talk: TalkChannel
+    """Cache of talks."""
+    whisper: TalkChannel
+    """Cache of whispers."""
+    game_info: Optional[GameInfo]
+    """The latest game information."""
+    game_setting: Optional[GameSetting]
+    """The game setting."""
+
+    def __init__(self) -> None:
+        """Initialize a new instance of PacketDecoder."""
+        self.talk = TalkChannel()
+        self.whisper = TalkChannel()
+        self.game_info = None
+        self.game_setting = None
+
+    def decode(self, line: str) -> Dict[str, Any]:
+        """Decode a packet, updating game_info and game_setting.
+
+        Args:
+            line: The packet (one line of JSON).
+
+        Returns:
+            The packet, in which talkList and whisperList have been emptied.
+        """
+        line = self._strip_list(line, "talkList", self.talk)
+        line = self._strip_list(line, "whisperList", self.whisper)
+        packet: Dict[str, Any] = json.loads(line)
+        if packet.get("gameSetting") is not None:
+            self.game_setting = GameSetting(packet["gameSetting"])
+        if packet.get("gameInfo") is not None:
+            self.game_info = GameInfo(packet["gameInfo"])
+        if packet.get("talkHistory"):
+            self.talk.extend(packet["talkHistory"])
+        if packet.get("whisperHistory"):
+            self.whisper.extend(packet["whisperHistory"])
+        if self.game_info is not None:
+            self.game_info.talk_list = self.talk.talks
+            self.game_info.whisper_list = self.whisper.talks
+        return packet
+
+    def stats(self) -> Dict[str, int]:
+        """Return the decoding counters of talks and whispers combined."""
+        return {name: getattr(self.talk, name) + getattr(self.whisper, name)
+                for name in ("bytes_total", "bytes_parsed", "talks_built", "talks_reused")}
+
+    @staticmethod
+    def _strip_list(line: str, key: str, channel: TalkChannel) -> str:
+        marker: str = f'"{key}":'
+        pos: int = line.find(marker)
+        if pos < 0:
+            return line
+        start: int = pos + len(marker)
+        while line[start] in _WHITESPACE:
+            start += 1
+        if line[start] != "[":
+            return line  # null
+        end: int = channel.decode_list(line, start)
+        return line[:start] + "[]" + line[end:]
+
+
+class DeltaTcpipClient:
+    """TCP/IP connection to the AIWolf server using PacketDecoder."""
+
+    def __init__(self, player: AbstractPlayer, name: str, host: str, port: int, request_role: str) -> None:
+        """Initialize a new instance of DeltaTcpipClient.
+
+        Args:
+            player: The player.
+            name: The name of the player.
+            host: The host name of the server.
+            port: The port of the server.
+            request_role: The role requested to the server.
+        """
+        self.player = player
+        self.name = name
+        self.host = host
+        self.port = port
+        self.request_role = request_role
+        self.decoder = PacketDecoder()
+
+    def connect(self) -> None:
+        """Play games until the server closes the connection."""
+        with socket.create_connection((self.host, self.port)) as sock:
+            with sock.makefile("r", encoding="utf-8", newline="\n") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    response: Optional[str] = self._respond(line)
+                    if response is not None:
+                        sock.sendall((response + "\n").encode("utf-8"))
+
+    def _respond(self, line: str) -> Optional[str]:
+        packet: Dict[str, Any] = self.decoder.decode(line)
+        request: str = packet["request"]
+        if request == "NAME":
+            return self.name if self.name else type(self.player).__name__
+        if request == "ROLE":
+            return self.request_role
+        game_info: GameInfo = self.decoder.game_info  # type: ignore
+        if request == "INITIALIZE":
+            self.decoder.talk.reset()
+            self.decoder.whisper.reset()
+            self.player.initialize(game_info, self.decoder.game_setting)  # type: ignore
+            return None
+        self.player.update(game_info)
+        if request == "DAILY_INITIALIZE":
+            self.player.day_start()
+        elif request == "FINISH":
+            self.player.finish()
+        elif request == "TALK":
+            return self.player.talk().text
+        elif request == "WHISPER":
+            return self.player.whisper().text
+        elif request == "VOTE":
+            return self._agent(self.player.vote())
+        elif request == "ATTACK":
+            return self._agent(self.player.attack())
+        elif request == "DIVINE":
+            return self._agent(self.player.divine())
+        elif request == "GUARD":
+            return self._agent(self.player.guard())
+        return None
+
+    @staticmethod
+    def _agent(agent: Agent) -> str:
+        return json.dumps({"agentIdx": agent.agent_idx}, separators=(",", ":"))
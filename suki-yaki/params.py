@@ -0,0 +1,77 @@
+#
+# params.py
+#
+# Copyright 2022 OTSUKI Takashi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Any, Dict, List
+
+
+class StrategyParams:
+    """Tunable constants of the strategies of all roles."""
+
+    seer_co_date: int = 3
+    """Scheduled comingout date of the seer."""
+    medium_co_date: int = 3
+    """Scheduled comingout date of the medium."""
+    possessed_co_date: int = 1
+    """Scheduled comingout date of the possessed."""
+    possessed_fake_wolf_prob: float = 0.5
+    """Probability that the possessed reports a werewolf in a fake judgement."""
+    werewolf_fake_wolf_prob: float = 0.3
+    """Probability that a werewolf reports a human as a werewolf in a fake judgement."""
+    werewolf_fake_seer_prob: float = 0.5
+    """Probability that a werewolf pretends to be a seer rather than a villager (15-player game)."""
+    divined_human_villager_belief_5: float = 0.7
+    """Belief that an agent divined as human is a villager (5-player game)."""
+    divined_human_villager_belief_15: float = 0.9
+    """Belief that an agent divined as human is a villager (other games)."""
+    fake_seer_target_wolf_belief: float = 0.8
+    """Belief that an agent which is a candidate for voting is a werewolf."""
+
+    def __init__(self, **overrides: Any) -> None:
+        """Initialize a new instance of StrategyParams.
+
+        Args:
+            overrides: Values replacing the defaults.
+        """
+        for name, value in overrides.items():
+            if name not in PARAM_NAMES:
+                raise ValueError(f"Unknown strategy parameter: {name}")
+            setattr(self, name, type(getattr(StrategyParams, name))(value))
+
+    def divined_human_villager_belief(self, player_num: int) -> float:
+        """Return the belief that an agent divined as human is a villager in a game of the given size."""
+        return self.divined_human_villager_belief_5 if player_num <= 5 else self.divined_human_villager_belief_15
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the parameters as a dictionary."""
+        return {name: getattr(self, name) for name in PARAM_NAMES}
+
+
+PARAM_NAMES: List[str] = [name for name in StrategyParams.__annotations__]
+"""Names of all strategy parameters."""
+
+SEARCH_SPACE: Dict[str, List[Any]] = {
+    "seer_co_date": [1, 2, 3],
+    "medium_co_date": [1, 2, 3],
+    "possessed_co_date": [1, 2],
+    "possessed_fake_wolf_prob": [0.2, 0.5, 0.8],
+    "werewolf_fake_wolf_prob": [0.1, 0.3, 0.5],
+    "werewolf_fake_seer_prob": [0.0, 0.5, 1.0],
+    "divined_human_villager_belief_5": [0.5, 0.7, 0.9],
+    "divined_human_villager_belief_15": [0.7, 0.9],
+    "fake_seer_target_wolf_belief": [0.6, 0.8, 1.0],
+}
+"""Candidate values of each parameter searched by the sweep harness."""
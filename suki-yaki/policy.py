@@ -0,0 +1,209 @@
+#
+# policy.py
+#
+# Copyright 2022 OTSUKI Takashi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import logging
+import random
+from typing import Dict, List, Optional, Tuple
+
+from aiwolf import Role, Species
+
+from params import StrategyParams
+
+FAKE_ROLE = "fake_role"
+"""Table of the fake role, keyed by actor/size."""
+CO_DAY = "co_day"
+"""Table of the comingout day, keyed by actor/fake role/size."""
+JUDGE = "judge"
+"""Table of the fake judgement, keyed by actor/fake role/size/day/(open|full)."""
+
+ACTORS: List[str] = ["possessed", "werewolf"]
+SIZES: List[str] = ["5", "15"]
+FAKE_ROLES: List[str] = [Role.SEER.name, Role.MEDIUM.name, Role.VILLAGER.name]
+CO_DAYS: List[str] = ["1", "2", "3"]
+"""Comingout days explored in self-play, extended by the day scheduled in the parameters (see co_days)."""
+DAYS: List[str] = ["1", "2", "3"]
+JUDGE_ACTIONS: List[str] = ["safe:WEREWOLF", "rival:WEREWOLF", "random:HUMAN", "cover:HUMAN"]
+"""Kind of target and result of a fake judgement.
+
+safe: an agent that is not (probably) a werewolf, rival: an agent claiming the same role,
+cover: a (probable) werewolf, random: any agent.
+"""
+ACTIONS: Dict[str, List[str]] = {FAKE_ROLE: FAKE_ROLES, CO_DAY: CO_DAYS, JUDGE: JUDGE_ACTIONS}
+
+Table = Dict[str, Dict[str, float]]
+"""Distribution over the actions for each state key."""
+
+logger = logging.getLogger(__name__)
+
+
+def size_of(player_num: int) -> str:
+    """Return the size bucket of a game."""
+    return "5" if player_num <= 5 else "15"
+
+
+def co_days(params: StrategyParams) -> List[str]:
+    """Return the comingout days to choose from, including the one the default tables schedule."""
+    if params.possessed_co_date < 1:
+        raise ValueError(f"possessed_co_date must be 1 or later: {params.possessed_co_date}")
+    return sorted(set(CO_DAYS) | {str(params.possessed_co_date)}, key=int)
+
+
+def default_tables(params: StrategyParams) -> Dict[str, Table]:
+    """Return tables reproducing the hand-written strategies with the given parameters."""
+    seer: float = params.werewolf_fake_seer_prob
+    fake_role: Table = {"possessed/5": {"SEER": 1.0}, "possessed/15": {"SEER": 1.0},
+                        "werewolf/5": {"VILLAGER": 1.0},
+                        "werewolf/15": {"SEER": seer, "VILLAGER": 1.0 - seer}}
+    co_day: Table = {f"{a}/{r}/{s}": {str(params.possessed_co_date): 1.0}
+                     for a in ACTORS for r in FAKE_ROLES for s in SIZES}
+    judge: Table = {}
+    for a in ACTORS:
+        wolf: float = params.possessed_fake_wolf_prob if a == "possessed" else params.werewolf_fake_wolf_prob
+        human: str = "cover:HUMAN" if a == "possessed" else "random:HUMAN"
+        for r in FAKE_ROLES:
+            for s in SIZES:
+                for d in DAYS:
+                    judge[f"{a}/{r}/{s}/{d}/open"] = {"safe:WEREWOLF": wolf, human: 1.0 - wolf}
+                    judge[f"{a}/{r}/{s}/{d}/full"] = {human: 1.0}
+    return {FAKE_ROLE: fake_role, CO_DAY: co_day, JUDGE: judge}
+
+
+class FakeJudgePolicy:
+    """Fake role, comingout day and fake judgements of the possessed and the werewolves.
+
+    Each decision is a lookup of a small state key in a table of action distributions,
+    followed by sampling among a handful of actions. The tables default to the hand-written
+    strategies and can be replaced by the ones learned in self-play (train_policy.py).
+    """
+
+    tables: Dict[str, Table]
+    """Action distributions of each table."""
+    co_days: List[str]
+    """Actions of the comingout day table."""
+    explore: float
+    """Probability of choosing a uniformly random action (for self-play)."""
+    decisions: List[Tuple[str, str, str]]
+    """(table, key, action) of the decisions made, collected by self-play."""
+
+    def __init__(self, params: Optional[StrategyParams] = None, path: Optional[str] = None,
+                 explore: float = 0.0) -> None:
+        """Initialize a new instance of FakeJudgePolicy.
+
+        Args:
+            params: Strategy parameters of the default tables.
+            path: JSON file of learned tables overriding the defaults.
+            explore: Probability of choosing a uniformly random action.
+        """
+        if params is None:
+            params = StrategyParams()
+        self.tables = default_tables(params)
+        self.co_days = co_days(params)
+        self.explore = explore
+        self.decisions = []
+        if path is not None:
+            self.load(path)
+
+    def load(self, path: str) -> None:
+        """Override the tables with the ones in a JSON file.
+
+        Args:
+            path: The file to read.
+        """
+        with open(path) as f:
+            learned: Dict[str, Table] = json.load(f)
+        for name, table in learned.items():
+            if name in self.tables:
+                self.tables[name].update(table)
+
+    def export(self, path: str) -> None:
+        """Save the tables to a JSON file.
+
+        Args:
+            path: The file to write.
+        """
+        with open(path, "w") as f:
+            json.dump(self.tables, f, indent=1, sort_keys=True)
+
+    def choose(self, table: str, key: str, allowed: Optional[List[str]] = None) -> str:
+        """Choose an action.
+
+        Args:
+            table: The table.
+            key: The state key.
+            allowed: Actions possible in the state. All actions of the table if None.
+
+        Returns:
+            The action.
+        """
+        actions: List[str] = allowed if allowed is not None else ACTIONS[table]
+        if self.explore > 0.0 and random.random() < self.explore:
+            action: str = random.choice(actions)
+        else:
+            dist: Dict[str, float] = self.tables[table].get(key, {})
+            weights: List[float] = [dist.get(a, 0.0) for a in actions]
+            if sum(weights) > 0.0:
+                action = random.choices(actions, weights)[0]
+            else:
+                logger.warning("No weight on the possible actions of %s[%s], choosing %s", table, key, actions[0])
+                action = actions[0]
+        if self.explore > 0.0:
+            self.decisions.append((table, key, action))
+        return action
+
+    def fake_role(self, actor: str, player_num: int, existing: List[Role]) -> Role:
+        """Choose the fake role among the existing ones."""
+        allowed: List[str] = [r for r in FAKE_ROLES if r == Role.VILLAGER.name or Role[r] in existing]
+        return Role[self.choose(FAKE_ROLE, f"{actor}/{size_of(player_num)}", allowed)]
+
+    def co_day(self, actor: str, fake_role: Role, player_num: int) -> int:
+        """Choose the day on which to come out."""
+        return int(self.choose(CO_DAY, f"{actor}/{fake_role.name}/{size_of(player_num)}", self.co_days))
+
+    def claim(self, actor: str, player_num: int, fake_role: Role) -> None:
+        """Record the fake role finally claimed in place of the one chosen.
+
+        The comingout day chosen for the abandoned role is forgotten as well,
+        so that self-play credits only the decisions actually played.
+        """
+        size: str = size_of(player_num)
+        chosen: List[str] = [a for t, k, a in self.decisions if t == FAKE_ROLE and k == f"{actor}/{size}"]
+        if not chosen or chosen[-1] == fake_role.name:
+            return
+        abandoned: str = f"{actor}/{chosen[-1]}/{size}"
+        self.decisions = [(FAKE_ROLE, k, fake_role.name) if t == FAKE_ROLE and k == f"{actor}/{size}" else (t, k, a)
+                          for t, k, a in self.decisions if not (t == CO_DAY and k == abandoned)]
+
+    def judgement(self, actor: str, fake_role: Role, player_num: int, day: int,
+                  open_wolves: bool) -> Tuple[str, Species]:
+        """Choose the kind of target and the result of a fake judgement.
+
+        Args:
+            actor: "possessed" or "werewolf".
+            fake_role: The fake role.
+            player_num: The number of players.
+            day: The current day.
+            open_wolves: Whether fewer werewolves than exist have been reported.
+
+        Returns:
+            The kind of target and the result.
+        """
+        key: str = f"{actor}/{fake_role.name}/{size_of(player_num)}/{min(max(day, 1), 3)}/" \
+            + ("open" if open_wolves else "full")
+        allowed: List[str] = JUDGE_ACTIONS if open_wolves else [a for a in JUDGE_ACTIONS if a.endswith("HUMAN")]
+        kind, result = self.choose(JUDGE, key, allowed).split(":")
+        return kind, Species[result]
@@ -15,7 +15,6 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import random
 from collections import deque
 from typing import Deque, List
 
@@ -26,6 +25,8 @@ from aiwolf import (Agent, ComingoutContentBuilder, Content,
 from aiwolf.constant import AGENT_NONE
 
 from const import CONTENT_SKIP, JUDGE_EMPTY
+from likelihood import WolfLikelihood
+from policy import FakeJudgePolicy
 from villager import SampleVillager
 
 
@@ -46,6 +47,12 @@ class SamplePossessed(SampleVillager):
     """The number of werewolves."""
     werewolves: List[Agent]
     """Fake werewolves."""
+    wolf_model: WolfLikelihood
+    """Likelihood of each agent being a real werewolf."""
+    policy: FakeJudgePolicy
+    """Tables of the fake role, the comingout day and the fake judgements."""
+    policy_actor: str = "possessed"
+    """Actor of the policy tables."""
 
     def __init__(self) -> None:
         """Initialize a new instance of SamplePossessed."""
@@ -57,40 +64,65 @@ class SamplePossessed(SampleVillager):
         self.not_judged_agents = []
         self.num_wolves = 0
         self.werewolves = []
+        self.wolf_model = WolfLikelihood()
+        self.policy = FakeJudgePolicy()
 
     def initialize(self, game_info: GameInfo, game_setting: GameSetting) -> None:
         super().initialize(game_info, game_setting)
-        self.fake_role = Role.SEER
-        self.co_date = 1
+        player_num: int = len(self.game_info.agent_list)
+        self.fake_role = self.policy.fake_role(self.policy_actor, player_num, self.game_info.existing_role_list)
+        self.co_date = self.policy.co_day(self.policy_actor, self.fake_role, player_num)
         self.has_co = False
         self.my_judgee_queue.clear()
         self.not_judged_agents = self.get_others(self.game_info.agent_list)
         self.num_wolves = game_setting.role_num_map.get(Role.WEREWOLF, 0)
         self.werewolves.clear()
+        self.wolf_model.start_game(self.game_info.agent_list, self.me, self.num_wolves)
 
     def get_fake_judge(self) -> Judge:
         """Generate a fake judgement."""
-        target: Agent = AGENT_NONE
-        if self.fake_role == Role.SEER: # Fake seer chooses a target randomly.
-            if self.game_info.day != 0:
-                target = self.random_select(self.get_alive(self.not_judged_agents))
-        elif self.fake_role == Role.MEDIUM:
-            target = self.game_info.executed_agent \
-                if self.game_info.executed_agent is not None \
-                else AGENT_NONE
-        if target == AGENT_NONE:
+        if self.fake_role == Role.SEER and self.game_info.day != 0:
+            pool: List[Agent] = self.get_alive(self.not_judged_agents)
+        elif self.fake_role == Role.MEDIUM and self.game_info.executed_agent is not None:
+            pool = [self.game_info.executed_agent]
+        else:
+            return JUDGE_EMPTY
+        if not pool:
             return JUDGE_EMPTY
-        # Determine a fake result.
-        # If the number of werewolves found is less than the total number of werewolves,
-        # judge as a werewolf with a probability of 0.5.
-        result: Species = Species.WEREWOLF \
-            if len(self.werewolves) < self.num_wolves and random.random() < 0.5 \
-            else Species.HUMAN
+        # Look up the kind of target and the result.
+        # A werewolf can be reported only while the number of werewolves found
+        # is less than the total number of werewolves.
+        kind, result = self.policy.judgement(self.policy_actor, self.fake_role, len(self.game_info.agent_list),
+                                             self.game_info.day, len(self.werewolves) < self.num_wolves)
+        likely_wolves: List[Agent] = self.likely_wolves()
+        if kind == "cover":
+            preferred: List[Agent] = [a for a in likely_wolves if a in pool]
+        elif kind == "rival":
+            preferred = [a for a in pool if self.comingout_map.get(a) == self.fake_role and a not in likely_wolves]
+        elif kind == "safe":
+            preferred = [a for a in pool if a not in likely_wolves]
+        else:
+            preferred = pool
+        target: Agent = self.random_select(preferred if preferred else pool)
+        # Never accuse a probable werewolf.
+        if target in likely_wolves:
+            result = Species.HUMAN
         judge = Judge(self.me, self.game_info.day, target, result)
         return judge
 
+    def likely_wolves(self) -> List[Agent]:
+        """Return the alive agents that are probably werewolves."""
+        return self.wolf_model.likely_wolves(self.get_alive_others(self.game_info.agent_list), self.num_wolves)
+
+    def observe_talk(self, talker: Agent, content: Content) -> None:
+        self.wolf_model.observe(talker, content)
+
     def day_start(self) -> None:
         super().day_start()
+        for vote in self.game_info.vote_list:
+            self.wolf_model.voted(vote.agent, vote.target)
+        for agent in self.game_info.last_dead_agent_list:
+            self.wolf_model.attacked(agent)
         # Process the fake judgement.
         judge: Judge = self.get_fake_judge()
         if judge != JUDGE_EMPTY:
@@ -116,16 +148,8 @@ class SamplePossessed(SampleVillager):
                 return Content(DivinedResultContentBuilder(judge.target, judge.result))
             elif self.fake_role == Role.MEDIUM:
                 return Content(IdentContentBuilder(judge.target, judge.result))
-        # Vote for one of the alive fake werewolves.
-        candidates: List[Agent] = self.get_alive(self.werewolves)
-        # Vote for one of the alive agent that declared itself the same role of Possessed
-        # if there are no candidates.
-        if not candidates:
-            candidates = self.get_alive([a for a in self.comingout_map
-                                         if self.comingout_map[a] == self.fake_role])
-        # Vite for one of the alive agents if there are no candidates.
-        if not candidates:
-            candidates = self.get_alive_others(self.game_info.agent_list)
+        candidates: List[Agent] = self.cached("possessed_vote", self.fake_candidates,
+                                              len(self.werewolves), self.fake_role, self.wolf_model.version)
         # Declare which to vote for if not declare yet or the candidate is changed.
         if self.vote_candidate == AGENT_NONE or self.vote_candidate not in candidates:
             if candidates:
@@ -141,3 +165,20 @@ class SamplePossessed(SampleVillager):
             if self.vote_candidate != AGENT_NONE:
                 return Content(VoteContentBuilder(self.vote_candidate))
         return CONTENT_SKIP
+
+    def fake_candidates(self) -> List[Agent]:
+        """Return the candidates for voting."""
+        # Vote for one of the alive fake werewolves.
+        candidates: List[Agent] = self.get_alive(self.werewolves)
+        # Vote for one of the alive agent that declared itself the same role of Possessed
+        # if there are no candidates.
+        if not candidates:
+            candidates = self.get_alive([a for a in self.comingout_map
+                                         if self.comingout_map[a] == self.fake_role])
+        # Vite for one of the alive agents if there are no candidates.
+        if not candidates:
+            candidates = self.get_alive_others(self.game_info.agent_list)
+        # Avoid voting for the probable werewolves.
+        likely_wolves: List[Agent] = self.likely_wolves()
+        safe: List[Agent] = [a for a in candidates if a not in likely_wolves]
+        return safe if safe else candidates
@@ -0,0 +1,122 @@
+#
+# rating.py
+#
+# Copyright 2022 OTSUKI Takashi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import math
+from typing import Dict, List, Tuple
+
+from aiwolf import Agent, Role
+from aiwolf.constant import AGENT_NONE
+
+from const import VILLAGERS, WEREWOLVES
+
+
+def side_of(role: Role) -> str:
+    """Return the side ("villagers" or "werewolves") the role belongs to."""
+    return WEREWOLVES if role in (Role.WEREWOLF, Role.POSSESSED) else VILLAGERS
+
+
+class SkillRatings:
+    """TrueSkill-style Gaussian skill ratings of each agent, kept separately for each side.
+
+    A game is a match between the village team and the werewolf team, each performing
+    as the mean of its members. A finished game updates every member in O(team size).
+    """
+
+    mu0: float
+    """Initial mean of a rating."""
+    sigma0: float
+    """Initial standard deviation of a rating."""
+    beta: float
+    """Standard deviation of the performance in a single game."""
+    tau: float
+    """Additive dynamics keeping ratings able to move."""
+    k: float
+    """Weight of the uncertainty in the conservative rating mu - k * sigma."""
+    ratings: Dict[str, Dict[Agent, List[float]]]
+    """[mean, variance] of each agent's rating on each side."""
+
+    def __init__(self, mu0: float = 25.0, sigma0: float = 25.0 / 3, beta: float = 25.0 / 6,
+                 tau: float = 25.0 / 300, k: float = 1.0) -> None:
+        """Initialize a new instance of SkillRatings.
+
+        Args:
+            mu0: Initial mean of a rating.
+            sigma0: Initial standard deviation of a rating.
+            beta: Standard deviation of the performance in a single game.
+            tau: Additive dynamics keeping ratings able to move.
+            k: Weight of the uncertainty in the conservative rating.
+        """
+        self.mu0 = mu0
+        self.sigma0 = sigma0
+        self.beta = beta
+        self.tau = tau
+        self.k = k
+        self.ratings = {VILLAGERS: {}, WEREWOLVES: {}}
+
+    def rating(self, agent: Agent, side: str) -> Tuple[float, float]:
+        """Return the mean and the standard deviation of the agent's rating on the side."""
+        r = self.ratings[side].get(agent)
+        return (self.mu0, self.sigma0) if r is None else (r[0], math.sqrt(r[1]))
+
+    def conservative(self, agent: Agent, side: str) -> float:
+        """Return mu - k * sigma of the agent's rating on the side."""
+        mu, sigma = self.rating(agent, side)
+        return mu - self.k * sigma
+
+    def strongest(self, side: str, candidates: List[Agent]) -> Agent:
+        """Return the candidate with the highest conservative rating on the side.
+
+        Args:
+            side: "villagers" or "werewolves".
+            candidates: Agents to choose from.
+
+        Returns:
+            The strongest candidate, or AGENT_NONE if none of them has been rated.
+        """
+        rated: List[Agent] = [a for a in candidates if a in self.ratings[side]]
+        if not rated:
+            return AGENT_NONE
+        return max(rated, key=lambda a: self.conservative(a, side))
+
+    def rate_game(self, role_map: Dict[Agent, Role], winner: str) -> None:
+        """Update the ratings from the result of a game.
+
+        Args:
+            role_map: Roles of all agents.
+            winner: The winning side.
+        """
+        teams: Dict[str, List[List[float]]] = {VILLAGERS: [], WEREWOLVES: []}
+        for agent, role in role_map.items():
+            side: str = side_of(role)
+            r: List[float] = self.ratings[side].setdefault(agent, [self.mu0, self.sigma0 ** 2])
+            r[1] += self.tau ** 2
+            teams[side].append(r)
+        if not teams[VILLAGERS] or not teams[WEREWOLVES]:
+            return
+        loser: str = WEREWOLVES if winner == VILLAGERS else VILLAGERS
+        mean: Dict[str, float] = {s: sum(r[0] for r in t) / len(t) for s, t in teams.items()}
+        var: float = sum(sum(r[1] for r in t) / len(t) ** 2 for t in teams.values()) + 2 * self.beta ** 2
+        c: float = math.sqrt(var)
+        t: float = (mean[winner] - mean[loser]) / c
+        cdf: float = max(0.5 * (1.0 + math.erf(t / math.sqrt(2.0))), 1e-12)
+        v: float = math.exp(-0.5 * t * t) / math.sqrt(2.0 * math.pi) / cdf
+        w: float = v * (v + t)
+        for side, sign in ((winner, 1.0), (loser, -1.0)):
+            n: int = len(teams[side])
+            for r in teams[side]:
+                r[0] += sign * r[1] / (n * c) * v
+                r[1] *= max(1.0 - r[1] / (n * n * var) * w, 1e-6)
@@ -15,16 +15,30 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import os
+import time
+from typing import Any, Callable, Optional
+
 from aiwolf import AbstractPlayer, Agent, Content, GameInfo, GameSetting, Role, Status
 
 from bodyguard import SampleBodyguard
+from calibration import BeliefCalibration
 from medium import SampleMedium
+from opponent import OpponentModel
+from params import StrategyParams
+from policy import FakeJudgePolicy
 from possessed import SamplePossessed
+from rating import SkillRatings
 from seer import SampleSeer
+from telemetry import TelemetrySink
 from villager import SampleVillager
 from werewolf import SampleWerewolf
-import numpy as np
-import pandas as pd
+
+OPPONENT_MODEL_FILE = "opponent.npz"
+"""File of the opponent model in the telemetry directory."""
+CALIBRATION_FILE = "calibration.npz"
+"""File of the belief calibration in the telemetry directory."""
+
 
 class SamplePlayer(AbstractPlayer):
 
@@ -35,8 +49,15 @@ class SamplePlayer(AbstractPlayer):
     possessed: AbstractPlayer
     werewolf: AbstractPlayer
     player: AbstractPlayer
-
-    def __init__(self) -> None:
+    opponent_model: OpponentModel
+    telemetry: TelemetrySink
+    params: StrategyParams
+    ratings: SkillRatings
+    calibration: BeliefCalibration
+    policy: FakeJudgePolicy
+
+    def __init__(self, telemetry_dir: Optional[str] = None, params: Optional[StrategyParams] = None,
+                 policy_path: Optional[str] = None) -> None:
         self.villager = SampleVillager()
         self.bodyguard = SampleBodyguard()
         self.medium = SampleMedium()
@@ -44,43 +65,77 @@ class SamplePlayer(AbstractPlayer):
         self.possessed = SamplePossessed()
         self.werewolf = SampleWerewolf()
         self.player = self.villager
-        self.firstgameflag = 1
-        self.countflag = 1
+        # Share one opponent model among the roles so that it learns from every game.
+        self.opponent_model = OpponentModel()
+        self.params = params if params is not None else StrategyParams()
+        self.ratings = SkillRatings()
+        self.calibration = BeliefCalibration()
+        for player in (self.villager, self.bodyguard, self.medium, self.seer, self.possessed, self.werewolf):
+            player.opponent_model = self.opponent_model
+            player.params = self.params
+            player.ratings = self.ratings
+            player.calibration = self.calibration
+        self.policy = FakeJudgePolicy(self.params, policy_path)
+        self.possessed.policy = self.policy
+        self.werewolf.policy = self.policy
+        self.telemetry = TelemetrySink(telemetry_dir)
+        if self.telemetry.enabled:
+            # Keep learning the opponent model and scoring the beliefs across sessions.
+            model_path: str = os.path.join(telemetry_dir, OPPONENT_MODEL_FILE)  # type: ignore
+            if os.path.exists(model_path):
+                self.opponent_model.load(model_path)
+            calibration_path: str = os.path.join(telemetry_dir, CALIBRATION_FILE)  # type: ignore
+            if os.path.exists(calibration_path):
+                self.calibration.load(calibration_path)
+            self.telemetry.on_flush.append(self._save)
+
+    def _save(self, directory: str) -> None:
+        """Save the state learned across games into the telemetry directory."""
+        self.opponent_model.export(os.path.join(directory, OPPONENT_MODEL_FILE))
+        self.calibration.export(os.path.join(directory, CALIBRATION_FILE))
+
+    def _timed(self, callback: str, fn: Callable[[], Any], decision: bool = False) -> Any:
+        """Call fn, recording its latency (and its result if it is a decision) to telemetry."""
+        if not self.telemetry.enabled:
+            return fn()
+        start: float = time.perf_counter()
+        result: Any = fn()
+        self.telemetry.latency(callback, time.perf_counter() - start)
+        if decision:
+            self.telemetry.decision(callback, getattr(result, "text", result))
+        return result
 
     def attack(self) -> Agent:
-        return self.player.attack()
+        return self._timed("attack", self.player.attack, True)
 
     def day_start(self) -> None:
-        self.player.day_start()
+        self._timed("day_start", self.player.day_start)
+        # After the role-specific updates of the day (divination, identification and fake judgements).
+        self.calibration.snapshot(self.player.prob)
+        if self.telemetry.enabled:
+            self.telemetry.belief(self.player.prob)
 
     def divine(self) -> Agent:
-        return self.player.divine()
+        return self._timed("divine", self.player.divine, True)
 
     def finish(self) -> None:
-        df_t = self.w_win.T
-        self.w_p = (df_t/df_t.sum()).T
-        df_t1 = self.v_win.T
-        self.v_p = (df_t1/df_t1.sum()).T
-        self.countflag += 1
-        self.player.finish(self.w_win,self.v_win,self.w_p, self.v_p,self.countflag)
+        self.ratings.rate_game(self.role_map, self.winner)
+        self.player.finish()
+        self.telemetry.annotate("decision_cache", self.player.decision_cache.metrics())
+        if self.calibration.latest is not None:
+            self.telemetry.annotate("calibration", self.calibration.latest.round(4).tolist())
+        my_side: str = 'werewolves' if self.my_role in (Role.WEREWOLF, Role.POSSESSED) else 'villagers'
+        self.telemetry.finish_game(self.winner, self.winner == my_side)
 
     def guard(self) -> Agent:
-        return self.player.guard()
+        return self._timed("guard", self.player.guard, True)
 
     def initialize(self, game_info: GameInfo, game_setting: GameSetting) -> None:
         role: Role = game_info.my_role
+        self.my_role = role
         self.winner = 'villagers'
         self.finish_flag = 0
-        if self.firstgameflag == 1:
-            self.w_win = pd.DataFrame(index=game_info.agent_list, columns=['werewolves_win','werewolves_lose'], dtype=float)
-            self.w_win[:] = 0
-            self.v_win = pd.DataFrame(index=game_info.agent_list, columns=['villagers_win','villagers_lose'], dtype=float)
-            self.v_win[:] = 0
-            self.firstgameflag = 0
-            df_t = self.w_win.T
-            self.w_p = (df_t/df_t.sum()).T
-            df_t1 = self.v_win.T
-            self.v_p = (df_t1/df_t1.sum()).T
+        self.role_map = {}
 
         if role == Role.VILLAGER:
             self.player = self.villager
@@ -94,12 +149,15 @@ class SamplePlayer(AbstractPlayer):
             self.player = self.possessed
         elif role == Role.WEREWOLF:
             self.player = self.werewolf
-        self.player.initialize(game_info, game_setting)
+        self.telemetry.start_game(role.name, str(game_info.me), len(game_info.agent_list))
+        self._timed("initialize", lambda: self.player.initialize(game_info, game_setting))
 
     def talk(self) -> Content:
-        return self.player.talk()
+        return self._timed("talk", self.player.talk, True)
 
     def update(self, game_info: GameInfo) -> None:
+        self.telemetry.set_day(game_info.day)
+        start: float = time.perf_counter()
         for agent in game_info.status_map:
             #logger.debug(agent)
             status = game_info.status_map[agent]
@@ -108,30 +166,19 @@ class SamplePlayer(AbstractPlayer):
                 if len(game_info.role_map) == len(game_info.agent_list):
                     self.finish_flag = 1
                     #logger.debug(status)
-                    if status == Status.ALIVE and ( role == Role.WEREWOLF or role == Role.POSSESSED ):
+                    # The werewolves win only if one of them survives (the possessed does not count).
+                    if status == Status.ALIVE and role == Role.WEREWOLF:
                         self.winner = 'werewolves'
 
 
-        if self.finish_flag == 1 :
-            for agent in game_info.status_map:
-                status = game_info.status_map[agent]
-                role = game_info.role_map[agent]
-                if  role == Role.WEREWOLF or role == Role.POSSESSED :
-                    if self.winner == 'werewolves':
-                        self.w_win.at[agent, 'werewolves_win'] += 1
-
-                    else:
-                        self.w_win.at[agent, 'werewolves_lose'] += 1
-                else:
-                    if self.winner == 'villagers':
-                        self.v_win.at[agent, 'villagers_win'] += 1
-                    else:
-                        self.v_win.at[agent, 'villagers_lose'] += 1
+        if self.finish_flag == 1:
+            self.role_map = game_info.role_map
 
-        self.player.update(game_info, self.w_p, self.v_p, self.countflag)
+        self.player.update(game_info)
+        self.telemetry.latency("update", time.perf_counter() - start)
 
     def vote(self) -> Agent:
-        return self.player.vote()
+        return self._timed("vote", self.player.vote, True)
 
     def whisper(self) -> Content:
-        return self.player.whisper()
+        return self._timed("whisper", self.player.whisper, True)
@@ -64,7 +64,7 @@ class SampleSeer(SampleVillager):
 
     def initialize(self, game_info: GameInfo, game_setting: GameSetting) -> None:
         super().initialize(game_info, game_setting)
-        self.co_date = 3
+        self.co_date = self.params.seer_co_date
         self.has_co = False
         self.my_judge_queue.clear()
         self.not_divined_agents = self.get_others(self.game_info.agent_list)
@@ -78,21 +78,19 @@ class SampleSeer(SampleVillager):
         logger.debug(f'judge_queue  {self.my_judge_queue}') """
         if judge is not None:
             self.my_judge_queue.append(judge)
+            self.constraint.learned(judge.target, judge.result)
             if judge.target in self.not_divined_agents:
                 self.not_divined_agents.remove(judge.target)
             if judge.result == Species.WEREWOLF:
                 self.werewolves.append(judge.target)
                 self.prob.at[judge.target, Role.WEREWOLF] = 1
             else:
-                if len(self.game_info.agent_list) == 5:
-                    self.prob.at[judge.target, Role.VILLAGER] = 0.7
-                    self.prob.at[judge.target, Role.WEREWOLF] = 0
-                else:
-                    self.prob.at[judge.target, Role.VILLAGER] = 0.9
-                    self.prob.at[judge.target, Role.WEREWOLF] = 0
+                self.prob.at[judge.target, Role.VILLAGER] = \
+                    self.params.divined_human_villager_belief(len(self.game_info.agent_list))
+                self.prob.at[judge.target, Role.WEREWOLF] = 0
 
-    def update(self, game_info: GameInfo, w_p, v_p, countflag) -> None:
-        super().update(game_info, w_p, v_p, countflag)
+    def update(self, game_info: GameInfo) -> None:
+        super().update(game_info)
         if Role.SEER in self.comingout_map.values():
             self.fake_seers = [k for k, v in self.comingout_map.items() if v == Role.SEER]
             for fake_seer in self.fake_seers:
@@ -108,12 +106,7 @@ class SampleSeer(SampleVillager):
         if self.has_co and self.my_judge_queue:
             judge: Judge = self.my_judge_queue.popleft()
             return Content(DivinedResultContentBuilder(judge.target, judge.result))
-        # Vote for one of the alive werewolves.
-        candidates: List[Agent] = self.get_alive(self.werewolves)
-        # Vote for one of the alive fake seers if there are no candidates.
-        if not candidates:
-            candidates = self.get_alive([a for a in self.comingout_map
-                                         if self.comingout_map[a] == Role.SEER])
+        candidates: List[Agent] = self.cached("seer_vote", self.seer_candidates, len(self.werewolves))
         # Vote for one of the alive agents if there are no candidates.
         # Declare which to vote for if not declare yet or the candidate is changed.
         if self.vote_candidate == AGENT_NONE or self.vote_candidate not in candidates:
@@ -128,7 +121,16 @@ class SampleSeer(SampleVillager):
                 return Content(VoteContentBuilder(self.vote_candidate))
         return CONTENT_SKIP
 
-        
+    def seer_candidates(self) -> List[Agent]:
+        """Return the candidates for voting."""
+        # Vote for one of the alive werewolves.
+        candidates: List[Agent] = self.get_alive(self.werewolves)
+        # Vote for one of the alive fake seers if there are no candidates.
+        if not candidates:
+            candidates = self.get_alive([a for a in self.comingout_map
+                                         if self.comingout_map[a] == Role.SEER])
+        return candidates
+
     def divine(self) -> Agent:
         # Divine a agent randomly chosen from undivined agents.[]
         if self.strong_agent_w in self.not_divined_agents:
@@ -0,0 +1,319 @@
+#
+# simulator.py
+#
+# Copyright 2022 OTSUKI Takashi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from aiwolf import AbstractPlayer, Agent, Content, GameInfo, GameSetting, Role
+
+from const import VILLAGERS, WEREWOLVES
+
+ROLE_NUM_5: Dict[Role, int] = {Role.VILLAGER: 2, Role.SEER: 1, Role.POSSESSED: 1, Role.WEREWOLF: 1}
+"""Role composition of the standard 5-player game."""
+ROLE_NUM_15: Dict[Role, int] = {Role.VILLAGER: 8, Role.SEER: 1, Role.MEDIUM: 1, Role.BODYGUARD: 1,
+                                Role.POSSESSED: 1, Role.WEREWOLF: 3}
+"""Role composition of the standard 15-player game."""
+ALL_ROLES: List[Role] = [Role.BODYGUARD, Role.FOX, Role.FREEMASON, Role.MEDIUM, Role.POSSESSED,
+                         Role.SEER, Role.VILLAGER, Role.WEREWOLF]
+"""Roles listed in roleNumMap of the game setting."""
+
+
+def default_role_num_map(player_num: int) -> Dict[Role, int]:
+    """Return the standard role composition for the number of players.
+
+    Args:
+        player_num: The number of players.
+
+    Returns:
+        The number of each role.
+    """
+    if player_num == 5:
+        return dict(ROLE_NUM_5)
+    if player_num == 15:
+        return dict(ROLE_NUM_15)
+    # Scale the 15-player composition (one werewolf per five players).
+    wolves: int = max(1, player_num // 5)
+    specials: Dict[Role, int] = {Role.SEER: 1, Role.MEDIUM: 1, Role.BODYGUARD: 1, Role.POSSESSED: 1}
+    villagers: int = player_num - wolves - sum(specials.values())
+    if villagers < 0:
+        raise ValueError(f"Too few players: {player_num}")
+    return {Role.VILLAGER: villagers, **specials, Role.WEREWOLF: wolves}
+
+
+class LocalGame:
+    """A game played locally among AbstractPlayer instances, without the server.
+
+    The players receive the same sequence of requests (update followed by the request itself)
+    as the TcpipClient would issue, with GameInfo/GameSetting built from server-format packets.
+    A talk (whisper) phase ends when every agent skips in a turn or the turn limit is reached.
+    """
+
+    players: List[AbstractPlayer]
+    """Players, the i-th of which is Agent[i+1]."""
+    role_num_map: Dict[Role, int]
+    """The number of each role."""
+    roles: Dict[int, Role]
+    """Role of each agent index."""
+    alive: Dict[int, bool]
+    """Whether each agent index is alive."""
+    day: int
+    """The current day."""
+    winner: Optional[str]
+    """The winning side once the game is over."""
+
+    def __init__(self, players: List[AbstractPlayer], role_num_map: Optional[Dict[Role, int]] = None,
+                 rng: Optional[random.Random] = None, max_talk_turn: int = 20, max_day: int = 20,
+                 roles: Optional[List[Role]] = None) -> None:
+        """Initialize a new instance of LocalGame.
+
+        Args:
+            players: Players of the game.
+            role_num_map: The number of each role. The standard composition if None.
+            rng: Random number generator for role assignment, ordering and tie-breaks.
+            max_talk_turn: The maximum number of talk (whisper) turns in a day.
+            max_day: The day on which the game is stopped if not over yet.
+            roles: Explicit role of each player; randomly assigned from role_num_map if None.
+        """
+        self.players = players
+        self.rng = rng if rng is not None else random.Random()
+        self.role_num_map = role_num_map if role_num_map is not None else default_role_num_map(len(players))
+        self.max_talk_turn = max_talk_turn
+        self.max_day = max_day
+        if roles is None:
+            roles = [r for r, n in self.role_num_map.items() for _ in range(n)]
+            self.rng.shuffle(roles)
+        if len(roles) != len(players):
+            raise ValueError("The number of roles does not match the number of players")
+        self.roles = {i + 1: r for i, r in enumerate(roles)}
+        self.alive = {i: True for i in self.roles}
+        self.day = 0
+        self.winner = None
+        self.talks: List[Dict[str, Any]] = []
+        self.whispers: List[Dict[str, Any]] = []
+        self.executed: int = -1
+        self.attacked: List[int] = []
+        self.divine_result: Optional[Dict[str, Any]] = None
+        self.medium_result: Optional[Dict[str, Any]] = None
+        self.guarded: int = -1
+        self.setting: Dict[str, Any] = self._game_setting()
+        self.game_setting: GameSetting = GameSetting(self.setting)
+
+    def run(self) -> str:
+        """Play the game to the end.
+
+        Returns:
+            The winning side ("villagers" or "werewolves").
+        """
+        for i in self.roles:
+            self._player(i).initialize(self._game_info(i), self.game_setting)
+        while self.winner is None:
+            self._day()
+            if self.winner is None:
+                self._night()
+            self.day += 1
+            if self.winner is None and self.day > self.max_day:
+                self.winner = VILLAGERS if self._num_wolves() == 0 else WEREWOLVES
+        for i in self.roles:
+            player: AbstractPlayer = self._player(i)
+            player.update(self._game_info(i, finished=True))
+            player.finish()
+        return self.winner
+
+    def _day(self) -> None:
+        self.talks = []
+        self.whispers = []
+        for i in self._alive():
+            self._player(i).update(self._game_info(i))
+            self._player(i).day_start()
+        self.divine_result = None
+        self.medium_result = None
+        self.attacked = []
+        if self.day > 0:
+            self._talk(self.talks, self._alive(), lambda p: p.talk())
+            self._execute()
+            if self.winner is not None:
+                return
+        if len(self._alive_wolves()) > 1:
+            self._talk(self.whispers, self._alive_wolves(), lambda p: p.whisper())
+
+    def _night(self) -> None:
+        seer: Optional[int] = self._alive_with(Role.SEER)
+        if seer is not None:
+            target: Agent = self._request(seer, lambda p: p.divine())
+            t: int = self._index(target)
+            if t > 0:
+                self.divine_result = self._judge(seer, t)
+        if self.day == 0:
+            return
+        guard: Optional[int] = self._alive_with(Role.BODYGUARD)
+        self.guarded = -1
+        if guard is not None:
+            t = self._index(self._request(guard, lambda p: p.guard()))
+            if t != guard and self.alive.get(t, False):
+                self.guarded = t
+        votes: List[int] = []
+        for i in self._alive_wolves():
+            t = self._index(self._request(i, lambda p: p.attack()))
+            if self.alive.get(t, False) and self.roles[t] != Role.WEREWOLF:
+                votes.append(t)
+        if votes:
+            target_idx: int = self._majority(votes)
+            if target_idx != self.guarded:
+                self.alive[target_idx] = False
+                self.attacked = [target_idx]
+                self._judge_end()
+
+    def _talk(self, log: List[Dict[str, Any]], speakers: List[int], request) -> None:
+        for turn in range(self.max_talk_turn):
+            order: List[int] = list(speakers)
+            self.rng.shuffle(order)
+            spoken: bool = False
+            for i in order:
+                content: Content = self._request(i, request)
+                text: str = content.text
+                log.append({"idx": len(log), "day": self.day, "turn": turn, "agent": i, "text": text})
+                if text not in ("Skip", "Over"):
+                    spoken = True
+            if not spoken:
+                break
+
+    def _execute(self) -> None:
+        alive: List[int] = self._alive()
+        votes: List[int] = []
+        for i in alive:
+            t: int = self._index(self._request(i, lambda p: p.vote()))
+            if t == i or not self.alive.get(t, False):
+                t = self.rng.choice([a for a in alive if a != i])
+            votes.append(t)
+        self.executed = self._majority(votes)
+        self.alive[self.executed] = False
+        medium: Optional[int] = self._alive_with(Role.MEDIUM)
+        if medium is not None:
+            self.medium_result = self._judge(medium, self.executed)
+        self._judge_end()
+
+    def _judge_end(self) -> None:
+        wolves: int = self._num_wolves()
+        humans: int = len(self._alive()) - wolves
+        if wolves == 0:
+            self.winner = VILLAGERS
+        elif wolves >= humans:
+            self.winner = WEREWOLVES
+
+    def _majority(self, votes: List[int]) -> int:
+        counts = Counter(votes)
+        top: int = max(counts.values())
+        return self.rng.choice(sorted(a for a, c in counts.items() if c == top))
+
+    def _judge(self, agent: int, target: int) -> Dict[str, Any]:
+        result: str = "WEREWOLF" if self.roles[target] == Role.WEREWOLF else "HUMAN"
+        return {"agent": agent, "day": self.day, "target": target, "result": result}
+
+    def _request(self, i: int, request) -> Any:
+        player: AbstractPlayer = self._player(i)
+        player.update(self._game_info(i))
+        return request(player)
+
+    def _player(self, i: int) -> AbstractPlayer:
+        return self.players[i - 1]
+
+    def _alive(self) -> List[int]:
+        return [i for i, a in self.alive.items() if a]
+
+    def _alive_wolves(self) -> List[int]:
+        return [i for i in self._alive() if self.roles[i] == Role.WEREWOLF]
+
+    def _num_wolves(self) -> int:
+        return len(self._alive_wolves())
+
+    def _alive_with(self, role: Role) -> Optional[int]:
+        for i in self._alive():
+            if self.roles[i] == role:
+                return i
+        return None
+
+    @staticmethod
+    def _index(agent: Any) -> int:
+        return agent.agent_idx if isinstance(agent, Agent) else -1
+
+    def _game_info(self, i: int, finished: bool = False) -> GameInfo:
+        return GameInfo(self.game_info_packet(i, finished))
+
+    def game_info_packet(self, i: int, finished: bool = False) -> Dict[str, Any]:
+        """Return the game information of agent i in the server's JSON format.
+
+        Args:
+            i: The index of the agent.
+            finished: Whether the game is over (all roles are revealed).
+
+        Returns:
+            The gameInfo part of a packet.
+        """
+        role: Role = self.roles[i]
+        if finished:
+            role_map = {str(a): r.name for a, r in self.roles.items()}
+        elif role == Role.WEREWOLF:
+            role_map = {str(a): r.name for a, r in self.roles.items() if r == Role.WEREWOLF}
+        else:
+            role_map = {str(i): role.name}
+        return {
+            "agent": i,
+            "attackVoteList": [],
+            "attackedAgent": -1,
+            "cursedFox": -1,
+            "day": self.day,
+            "divineResult": self.divine_result if role == Role.SEER else None,
+            "executedAgent": self.executed if self.day > 0 else -1,
+            "existingRoleList": [r.name for r, n in self.role_num_map.items() if n > 0],
+            "guardedAgent": self.guarded if role == Role.BODYGUARD else -1,
+            "lastDeadAgentList": list(self.attacked),
+            "latestAttackVoteList": [],
+            "latestExecutedAgent": self.executed,
+            "latestVoteList": [],
+            "mediumResult": self.medium_result if role == Role.MEDIUM else None,
+            "remainTalkMap": {},
+            "remainWhisperMap": {},
+            "roleMap": role_map,
+            "statusMap": {str(a): "ALIVE" if alive else "DEAD" for a, alive in self.alive.items()},
+            "talkList": list(self.talks),
+            "voteList": [],
+            "whisperList": list(self.whispers) if role == Role.WEREWOLF else [],
+        }
+
+    def _game_setting(self) -> Dict[str, Any]:
+        return {
+            "enableNoAttack": False,
+            "enableNoExecution": False,
+            "enableRoleRequest": False,
+            "maxAttackRevote": 1,
+            "maxRevote": 1,
+            "maxSkip": 2,
+            "maxTalk": 10,
+            "maxTalkTurn": self.max_talk_turn,
+            "maxWhisper": 10,
+            "maxWhisperTurn": self.max_talk_turn,
+            "playerNum": len(self.players),
+            "randomSeed": 0,
+            "roleNumMap": {r.name: self.role_num_map.get(r, 0) for r in ALL_ROLES},
+            "talkOnFirstDay": False,
+            "timeLimit": -1,
+            "validateUtterance": True,
+            "votableInFirstDay": False,
+            "voteVisible": True,
+            "whisperBeforeRevote": False,
+        }
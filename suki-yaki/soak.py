@@ -0,0 +1,123 @@
+#!/usr/bin/env -S python -B
+#
+# soak.py
+#
+# Copyright 2022 OTSUKI Takashi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import random
+import resource
+import sys
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from aiwolf import AbstractPlayer
+
+from sample import SamplePlayer
+from simulator import LocalGame
+from timed import TimedPlayer
+
+
+def rss_bytes() -> int:
+    """Return the current resident set size of this process (the peak if unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        peak: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def sample(game: int, recorder: TimedPlayer, elapsed: float) -> Dict[str, Any]:
+    """Return a row of measurements taken after the game."""
+    row: Dict[str, Any] = {"game": game, "seconds": round(elapsed, 1), "rss_mb": rss_bytes() / 2 ** 20}
+    if tracemalloc.is_tracing():
+        row["traced_mb"] = tracemalloc.get_traced_memory()[0] / 2 ** 20
+    every: List[float] = [s for samples in recorder.samples.values() for s in samples]
+    row["p99_ms"] = float(np.percentile(every, 99)) * 1e3 if every else float("nan")
+    for name, samples in sorted(recorder.samples.items()):
+        row[f"{name}_p99_ms"] = float(np.percentile(samples, 99)) * 1e3
+    return row
+
+
+def top_allocators(baseline: tracemalloc.Snapshot, limit: int) -> List[str]:
+    """Return the source lines whose allocations grew the most since the baseline."""
+    snapshot: tracemalloc.Snapshot = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, tracemalloc.__file__)])
+    return [str(stat) for stat in snapshot.compare_to(baseline, "lineno")[:limit]]
+
+
+def main() -> None:
+    parser: ArgumentParser = ArgumentParser(description="Play many games with one SamplePlayer and watch for drift.")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--players", type=int, default=5)
+    parser.add_argument("--interval", type=int, default=500, help="games between samples")
+    parser.add_argument("--warmup", type=int, default=1,
+                        help="samples skipped before the baseline (caches and models filling up)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tracemalloc", type=int, default=0, metavar="N",
+                        help="trace allocations and print the top N growing lines at each sample")
+    parser.add_argument("--max-rss-growth", type=float, default=64.0, help="MB over the baseline sample")
+    parser.add_argument("--max-p99-ratio", type=float, default=2.0, help="p99 latency over the baseline sample")
+    parser.add_argument("--output", type=str, default=None, help="CSV file to write the samples")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    rng: random.Random = random.Random(args.seed)
+    recorder: TimedPlayer = TimedPlayer(SamplePlayer())
+    players: List[AbstractPlayer] = [recorder] + [SamplePlayer() for _ in range(args.players - 1)]
+    if args.tracemalloc > 0:
+        tracemalloc.start()
+    baseline_trace: Optional[tracemalloc.Snapshot] = None
+    rows: List[Dict[str, Any]] = []
+    start: float = time.perf_counter()
+    for game in range(1, args.games + 1):
+        LocalGame(players, rng=rng).run()
+        if game % args.interval != 0 and game != args.games:
+            continue
+        rows.append(sample(game, recorder, time.perf_counter() - start))
+        recorder.reset()
+        r: Dict[str, Any] = rows[-1]
+        print(f"game {game:6d}  rss {r['rss_mb']:8.1f} MB  p99 {r['p99_ms']:8.3f} ms", flush=True)
+        if args.tracemalloc > 0:
+            # The baseline is the sample after the warm-up, the same one the drift is measured from.
+            if len(rows) == args.warmup + 1:
+                baseline_trace = tracemalloc.take_snapshot()
+            elif baseline_trace is not None:
+                for line in top_allocators(baseline_trace, args.tracemalloc):
+                    print(f"    {line}")
+
+    table: pd.DataFrame = pd.DataFrame(rows)
+    if args.output is not None:
+        table.to_csv(args.output, index=False)
+    if len(rows) <= args.warmup + 1:
+        print("too few samples to measure drift")
+        return
+    base: Dict[str, Any] = rows[args.warmup]
+    last: Dict[str, Any] = rows[-1]
+    rss_growth: float = last["rss_mb"] - base["rss_mb"]
+    p99_ratio: float = last["p99_ms"] / base["p99_ms"] if base["p99_ms"] > 0 else float("nan")
+    print(f"rss growth {rss_growth:+.1f} MB (limit {args.max_rss_growth}), "
+          f"p99 ratio {p99_ratio:.2f} (limit {args.max_p99_ratio})")
+    if rss_growth > args.max_rss_growth or p99_ratio > args.max_p99_ratio:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -20,14 +20,19 @@ from argparse import ArgumentParser
 
 from aiwolf import AbstractPlayer, TcpipClient
 
+from packet import DeltaTcpipClient
 from sample import SamplePlayer
 
 if __name__ == "__main__":
-    agent: AbstractPlayer = SamplePlayer()
     parser: ArgumentParser = ArgumentParser(add_help=False)
     parser.add_argument("-p", type=int, action="store", dest="port", required=True)
     parser.add_argument("-h", type=str, action="store", dest="hostname", required=True)
     parser.add_argument("-r", type=str, action="store", dest="role", default="none")
     parser.add_argument("-n", type=str, action="store", dest="name")
+    parser.add_argument("-t", type=str, action="store", dest="telemetry", default=None)
+    parser.add_argument("-d", action="store_true", dest="delta")
+    parser.add_argument("-f", type=str, action="store", dest="policy", default=None)
     input_args = parser.parse_args()
-    TcpipClient(agent, input_args.name, input_args.hostname, input_args.port, input_args.role).connect()
+    agent: AbstractPlayer = SamplePlayer(input_args.telemetry, policy_path=input_args.policy)
+    client = DeltaTcpipClient if input_args.delta else TcpipClient
+    client(agent, input_args.name, input_args.hostname, input_args.port, input_args.role).connect()
@@ -0,0 +1,127 @@
+#!/usr/bin/env -S python -B
+#
+# sweep.py
+#
+# Copyright 2022 OTSUKI Takashi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import itertools
+import math
+import os
+import random
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Tuple
+
+import pandas as pd
+from aiwolf import Role
+
+from const import WEREWOLVES
+from params import SEARCH_SPACE, StrategyParams
+from sample import SamplePlayer
+from simulator import LocalGame
+
+
+def grid_configs(names: List[str]) -> List[Dict[str, Any]]:
+    """Return every combination of the candidate values of the given parameters.
+
+    Args:
+        names: Parameters to search. The others keep their default values.
+
+    Returns:
+        The list of configurations.
+    """
+    values: List[List[Any]] = [SEARCH_SPACE[n] for n in names]
+    return [dict(zip(names, combination)) for combination in itertools.product(*values)]
+
+
+def random_configs(names: List[str], samples: int, rng: random.Random) -> List[Dict[str, Any]]:
+    """Return configurations sampled uniformly from the candidate values.
+
+    Args:
+        names: Parameters to search. The others keep their default values.
+        samples: The number of configurations.
+        rng: Random number generator.
+
+    Returns:
+        The list of configurations.
+    """
+    return [{n: rng.choice(SEARCH_SPACE[n]) for n in names} for _ in range(samples)]
+
+
+def evaluate(task: Tuple[Dict[str, Any], int, int, int]) -> Dict[str, Any]:
+    """Play games in which Agent[1] uses the configuration and the others use the defaults.
+
+    Args:
+        task: The configuration, the number of games, the number of players and the random seed.
+
+    Returns:
+        A row of the results table.
+    """
+    config, games, player_num, seed = task
+    random.seed(seed)
+    rng: random.Random = random.Random(seed)
+    candidate: SamplePlayer = SamplePlayer(params=StrategyParams(**config))
+    players: List[SamplePlayer] = [candidate] + [SamplePlayer() for _ in range(player_num - 1)]
+    wins: int = 0
+    for _ in range(games):
+        game: LocalGame = LocalGame(players, rng=rng)
+        winner: str = game.run()
+        wolf_side: bool = game.roles[1] in (Role.WEREWOLF, Role.POSSESSED)
+        if (winner == WEREWOLVES) == wolf_side:
+            wins += 1
+    win_rate: float = wins / games
+    return {**config, "games": games, "wins": wins, "win_rate": win_rate,
+            "stderr": math.sqrt(win_rate * (1 - win_rate) / games)}
+
+
+def main() -> None:
+    parser: ArgumentParser = ArgumentParser(description="Sweep strategy parameters in simulated games.")
+    parser.add_argument("--mode", choices=["grid", "random"], default="random")
+    parser.add_argument("--params", type=str, default=",".join(SEARCH_SPACE),
+                        help="comma-separated parameters to search")
+    parser.add_argument("--samples", type=int, default=200, help="configurations for random search")
+    parser.add_argument("--games", type=int, default=100, help="games per configuration")
+    parser.add_argument("--players", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=str, default="sweep_results.csv")
+    args = parser.parse_args()
+
+    names: List[str] = [n for n in args.params.split(",") if n]
+    for name in names:
+        if name not in SEARCH_SPACE:
+            parser.error(f"unknown parameter: {name}")
+    rng: random.Random = random.Random(args.seed)
+    configs: List[Dict[str, Any]] = grid_configs(names) if args.mode == "grid" \
+        else random_configs(names, args.samples, rng)
+    tasks = [(c, args.games, args.players, args.seed + i) for i, c in enumerate(configs)]
+
+    rows: List[Dict[str, Any]] = []
+    # The worker processes are reused for all configurations.
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(evaluate, t) for t in tasks]
+        for n, future in enumerate(as_completed(futures), 1):
+            rows.append(future.result())
+            print(f"\r{n}/{len(futures)} configurations", end="", flush=True)
+    print()
+
+    table: pd.DataFrame = pd.DataFrame(rows).sort_values(["win_rate", "stderr"], ascending=[False, True])
+    table.insert(0, "rank", range(1, len(table) + 1))
+    table.to_csv(args.output, index=False)
+    print(table.head(10).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#
+# telemetry.py
+#
+# Copyright 2022 OTSUKI Takashi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import atexit
+import gzip
+import json
+import math
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class TelemetrySink:
+    """Buffered per-game telemetry written as gzip-compressed JSON lines.
+
+    Nothing is written while a game is running. Each finished game becomes one record,
+    records are buffered in memory and appended to the current file in bulk,
+    and the file is rotated when it grows beyond max_bytes.
+    """
+
+    directory: Optional[str]
+    """Output directory. Telemetry is disabled if None."""
+    flush_every: int
+    """The number of finished games buffered before writing."""
+    max_bytes: int
+    """Size at which the current file is rotated."""
+    num_games: int
+    """The number of games recorded in this session."""
+    on_flush: List[Callable[[str], None]]
+    """Functions saving other state into the directory whenever the records are flushed."""
+
+    def __init__(self, directory: Optional[str] = None, flush_every: int = 50,
+                 max_bytes: int = 64 * 1024 * 1024) -> None:
+        """Initialize a new instance of TelemetrySink.
+
+        Args:
+            directory: Output directory. Telemetry is disabled if None.
+            flush_every: The number of finished games buffered before writing.
+            max_bytes: Size at which the current file is rotated.
+        """
+        self.directory = directory
+        self.flush_every = flush_every
+        self.max_bytes = max_bytes
+        self.num_games = 0
+        self.on_flush = []
+        self._buffer: List[str] = []
+        self._path: Optional[str] = None
+        self._session = time.strftime("%Y%m%d-%H%M%S")
+        self._part = 0
+        self._start_game()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            atexit.register(self.flush)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether telemetry is recorded."""
+        return self.directory is not None
+
+    def start_game(self, role: str, me: str, num_agents: int) -> None:
+        """Begin the record of a new game.
+
+        Args:
+            role: My role.
+            me: My agent.
+            num_agents: The number of agents in the game.
+        """
+        self._start_game()
+        self._record.update(role=role, me=me, num_agents=num_agents)
+
+    def set_day(self, day: int) -> None:
+        """Set the current day of the game."""
+        self._day = day
+
+    def decision(self, kind: str, target: Any) -> None:
+        """Record a decision made on the current day.
+
+        Args:
+            kind: The kind of decision (e.g. "vote").
+            target: The decision (an agent or a content).
+        """
+        if self.enabled:
+            self._decisions.setdefault(self._day, []).append((kind, str(target)))
+
+    def belief(self, prob: pd.DataFrame) -> None:
+        """Snapshot the belief matrix of the current day.
+
+        Args:
+            prob: The belief matrix (agent x role).
+        """
+        if self.enabled:
+            self._beliefs[self._day] = prob.to_numpy(dtype=float, copy=True)
+            if self._belief_axes is None:
+                self._belief_axes = ([str(a) for a in prob.index], [str(r) for r in prob.columns])
+
+    def latency(self, callback: str, seconds: float) -> None:
+        """Record the time spent in a callback."""
+        if self.enabled:
+            self._latencies.setdefault(callback, []).append(seconds)
+
+    def annotate(self, key: str, value: Any) -> None:
+        """Attach a JSON-serializable value to the record of the current game."""
+        if self.enabled:
+            self._record[key] = value
+
+    def finish_game(self, winner: str, won: bool) -> None:
+        """Close the record of the current game and buffer it.
+
+        Args:
+            winner: The winning side.
+            won: Whether I won.
+        """
+        if not self.enabled:
+            return
+        self.num_games += 1
+        record: Dict[str, Any] = self._record
+        record.update(game=self.num_games, winner=winner, won=won)
+        record["decisions"] = {str(d): v for d, v in self._decisions.items()}
+        if self._belief_axes is not None:
+            record["belief_agents"], record["belief_roles"] = self._belief_axes
+            record["beliefs"] = {str(d): [[None if math.isnan(x) else round(x, 4) for x in row]
+                                          for row in p.tolist()]
+                                 for d, p in self._beliefs.items()}
+        record["latency_ms"] = {name: self._summarize(values) for name, values in self._latencies.items()}
+        self._buffer.append(json.dumps(record, separators=(",", ":")))
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        """Append the buffered records to the current file and call the on_flush functions."""
+        if self.directory is None:
+            return
+        if self._buffer:
+            path: str = self._current_path()
+            with gzip.open(path, "at", encoding="utf-8") as f:
+                f.write("\n".join(self._buffer))
+                f.write("\n")
+            self._buffer.clear()
+        for fn in self.on_flush:
+            fn(self.directory)
+
+    def _current_path(self) -> str:
+        if self._path is None or os.path.getsize(self._path) >= self.max_bytes:
+            self._part += 1
+            self._path = os.path.join(self.directory,  # type: ignore
+                                      f"telemetry-{self._session}-{self._part:05d}.jsonl.gz")
+        return self._path
+
+    def _start_game(self) -> None:
+        self._record: Dict[str, Any] = {}
+        self._day = 0
+        self._decisions: Dict[int, List[tuple]] = {}
+        self._beliefs: Dict[int, np.ndarray] = {}
+        self._belief_axes: Optional[tuple] = None
+        self._latencies: Dict[str, List[float]] = {}
+
+    @staticmethod
+    def _summarize(values: List[float]) -> Dict[str, float]:
+        a: np.ndarray = np.asarray(values) * 1000.0
+        return {"count": int(a.size), "mean": round(float(a.mean()), 4),
+                "p99": round(float(np.percentile(a, 99)), 4), "max": round(float(a.max()), 4)}
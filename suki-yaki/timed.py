@@ -0,0 +1,87 @@
+#
+# timed.py
+#
+# Copyright 2022 OTSUKI Takashi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import time
+from typing import Any, Dict, List
+
+from aiwolf import AbstractPlayer, Agent, Content, GameInfo, GameSetting
+
+
+class TimedPlayer(AbstractPlayer):
+    """Wrapper of a player measuring the time spent in each callback since the last reset."""
+
+    player: AbstractPlayer
+    """The wrapped player."""
+    samples: Dict[str, List[float]]
+    """Time (seconds) spent in every call of each callback."""
+
+    def __init__(self, player: AbstractPlayer) -> None:
+        """Initialize a new instance of TimedPlayer.
+
+        Args:
+            player: The player to be measured.
+        """
+        self.player = player
+        self.samples = {}
+
+    def reset(self) -> None:
+        """Forget the times measured so far."""
+        self.samples = {}
+
+    def seconds(self, name: str) -> float:
+        """Return the total time spent in a callback."""
+        return sum(self.samples.get(name, []))
+
+    def calls(self, name: str) -> int:
+        """Return the number of calls of a callback."""
+        return len(self.samples.get(name, []))
+
+    def _call(self, name: str, *args: Any) -> Any:
+        start: float = time.perf_counter()
+        result: Any = getattr(self.player, name)(*args)
+        self.samples.setdefault(name, []).append(time.perf_counter() - start)
+        return result
+
+    def attack(self) -> Agent:
+        return self._call("attack")
+
+    def day_start(self) -> None:
+        self._call("day_start")
+
+    def divine(self) -> Agent:
+        return self._call("divine")
+
+    def finish(self) -> None:
+        self._call("finish")
+
+    def guard(self) -> Agent:
+        return self._call("guard")
+
+    def initialize(self, game_info: GameInfo, game_setting: GameSetting) -> None:
+        self._call("initialize", game_info, game_setting)
+
+    def talk(self) -> Content:
+        return self._call("talk")
+
+    def update(self, game_info: GameInfo) -> None:
+        self._call("update", game_info)
+
+    def vote(self) -> Agent:
+        return self._call("vote")
+
+    def whisper(self) -> Content:
+        return self._call("whisper")
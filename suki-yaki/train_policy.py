@@ -0,0 +1,129 @@
+#!/usr/bin/env -S python -B
+#
+# train_policy.py
+#
+# Copyright 2022 OTSUKI Takashi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import os
+import random
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+import pandas as pd
+from aiwolf import Role
+
+from const import WEREWOLVES
+from policy import FakeJudgePolicy, Table
+from sample import SamplePlayer
+from simulator import LocalGame
+
+Stats = Dict[Tuple[str, str, str], List[int]]
+"""[decisions, wins] of each (table, key, action)."""
+
+
+def play(task: Tuple[Dict[str, Table], int, int, float, int]) -> Stats:
+    """Play self-play games with exploration and count the wins after each decision.
+
+    Args:
+        task: The tables, the number of games, the number of players, the exploration rate and the seed.
+
+    Returns:
+        The statistics of the decisions made by the possessed and the werewolves.
+    """
+    tables, games, player_num, explore, seed = task
+    random.seed(seed)
+    rng: random.Random = random.Random(seed)
+    players: List[SamplePlayer] = [SamplePlayer() for _ in range(player_num)]
+    for p in players:
+        p.policy.tables = copy.deepcopy(tables)
+        p.policy.explore = explore
+    stats: Stats = {}
+    for _ in range(games):
+        for p in players:
+            p.policy.decisions.clear()
+        game: LocalGame = LocalGame(players, rng=rng)
+        won: int = int(game.run() == WEREWOLVES)
+        for i, p in enumerate(players, 1):
+            if game.roles[i] not in (Role.WEREWOLF, Role.POSSESSED):
+                continue
+            for decision in p.policy.decisions:
+                s: List[int] = stats.setdefault(decision, [0, 0])
+                s[0] += 1
+                s[1] += won
+    return stats
+
+
+def improve(tables: Dict[str, Table], stats: Stats, min_count: int) -> Dict[str, Table]:
+    """Return the tables choosing the action with the highest win rate in every well-explored state."""
+    best: Dict[Tuple[str, str], Tuple[float, str]] = {}
+    for (table, key, action), (n, wins) in stats.items():
+        if n < min_count:
+            continue
+        rate: float = wins / n
+        if (table, key) not in best or rate > best[(table, key)][0]:
+            best[(table, key)] = (rate, action)
+    improved: Dict[str, Table] = copy.deepcopy(tables)
+    for (table, key), (_, action) in best.items():
+        improved[table][key] = {action: 1.0}
+    return improved
+
+
+def main() -> None:
+    parser: ArgumentParser = ArgumentParser(description="Learn the fake-judgement tables by self-play.")
+    parser.add_argument("--games", type=int, default=20000, help="games per round")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--players", type=int, default=15)
+    parser.add_argument("--explore", type=float, default=0.3)
+    parser.add_argument("--min-count", type=int, default=200, help="decisions needed to trust a win rate")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk", type=int, default=100, help="games per task")
+    parser.add_argument("--init", type=str, default=None, help="tables to start from")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stats", type=str, default=None, help="CSV file to write the win rates")
+    parser.add_argument("--output", type=str, default="fake_policy.json")
+    args = parser.parse_args()
+
+    policy: FakeJudgePolicy = FakeJudgePolicy(path=args.init)
+    seed: int = args.seed
+    stats: Stats = {}
+    # The worker processes are reused for all rounds.
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for r in range(args.rounds):
+            chunks: List[int] = [args.chunk] * (args.games // args.chunk)
+            if args.games % args.chunk:
+                chunks.append(args.games % args.chunk)
+            tasks = [(policy.tables, n, args.players, args.explore, seed + i) for i, n in enumerate(chunks)]
+            seed += len(tasks)
+            stats = {}
+            for result in pool.map(play, tasks):
+                for decision, (n, wins) in result.items():
+                    s: List[int] = stats.setdefault(decision, [0, 0])
+                    s[0] += n
+                    s[1] += wins
+            policy.tables = improve(policy.tables, stats, args.min_count)
+            print(f"round {r + 1}/{args.rounds}: {sum(s[0] for s in stats.values())} decisions "
+                  f"in {len({(t, k) for t, k, _ in stats})} states", flush=True)
+
+    policy.export(args.output)
+    if args.stats is not None:
+        table: pd.DataFrame = pd.DataFrame([{"table": t, "key": k, "action": a, "count": n, "win_rate": w / n}
+                                            for (t, k, a), (n, w) in stats.items()])
+        table.sort_values(["table", "key", "win_rate"], ascending=[True, True, False]).to_csv(args.stats, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -18,7 +18,7 @@
 import random
 import numpy as np
 import pandas as pd
-from typing import Dict, List
+from typing import Any, Callable, Dict, Hashable, List
 
 
 from aiwolf import (AbstractPlayer, Agent, Content, GameInfo, GameSetting,
@@ -26,7 +26,13 @@ from aiwolf import (AbstractPlayer, Agent, Content, GameInfo, GameSetting,
                     VoteContentBuilder)
 from aiwolf.constant import AGENT_NONE
 
-from const import CONTENT_SKIP
+from calibration import BeliefCalibration
+from const import CONTENT_SKIP, VILLAGERS, WEREWOLVES
+from constraint import ConstraintEngine
+from opponent import OpponentModel
+from params import StrategyParams
+from rating import SkillRatings
+from zobrist import DecisionCache, ZobristHash
 """ import logging
 
 
@@ -61,6 +67,20 @@ class SampleVillager(AbstractPlayer):
     """Time series of identification reports."""
     talk_list_head: int
     """Index of the talk to be analysed next."""
+    constraint: ConstraintEngine
+    """Hard facts derived from comingouts, judgements and deaths."""
+    opponent_model: OpponentModel
+    """Role predictor learned from the behaviour of agents in past games."""
+    params: StrategyParams
+    """Strategy constants."""
+    ratings: SkillRatings
+    """Skill ratings of the agents on each side."""
+    calibration: BeliefCalibration
+    """Scores of the belief matrix in finished games."""
+    state_hash: ZobristHash
+    """Hash of the comingouts, divination reports, dead agents and the latest strong vote."""
+    decision_cache: DecisionCache
+    """Candidate lists evaluated for each state_hash."""
 
     def __init__(self) -> None:
         """Initialize a new instance of SampleVillager."""
@@ -72,6 +92,13 @@ class SampleVillager(AbstractPlayer):
         self.divination_reports = []
         self.identification_reports = []
         self.talk_list_head = 0
+        self.constraint = ConstraintEngine()
+        self.opponent_model = OpponentModel()
+        self.params = StrategyParams()
+        self.ratings = SkillRatings()
+        self.calibration = BeliefCalibration()
+        self.state_hash = ZobristHash()
+        self.decision_cache = DecisionCache()
         self.strong_agent_v = AGENT_NONE
         self.strong_agent_w = AGENT_NONE
 
@@ -139,16 +166,8 @@ class SampleVillager(AbstractPlayer):
         self.my_role = game_info.role_map[self.me]
         self.winner = 'villagers'
         self.first_updateflag = 1
-        if len(self.game_info.agent_list) == 5:
-            self.role_list = [Role.VILLAGER, Role.SEER, Role.POSSESSED, Role.WEREWOLF]
-            self.prob = pd.DataFrame(index=self.game_info.agent_list, columns=self.role_list, dtype=float)
-            self.prob[:] = 0.5
-            self.prob.at[self.me, self.my_role] = 1
-        else:
-            self.role_list = [Role.VILLAGER, Role.SEER, Role.MEDIUM, Role.BODYGUARD, Role.WEREWOLF, Role.POSSESSED]
-            self.prob = pd.DataFrame(index=self.game_info.agent_list, columns=self.role_list, dtype=float)
-            self.prob[:] = 0.5
-            self.prob.at[self.me, self.my_role] = 1
+        self.role_list = [r for r in game_info.existing_role_list if game_setting.role_num_map.get(r, 0) > 0]
+        self.init_belief(game_info.role_map)
 
         """logger.debug('initialize')
         logger.debug(f'me {self.me}')
@@ -158,27 +177,80 @@ class SampleVillager(AbstractPlayer):
         self.comingout_map.clear()
         self.divination_reports.clear()
         self.identification_reports.clear()
+        self.state_hash.clear()
+        self.decision_cache.clear()
+        self.constraint.initialize(self.me, game_info.role_map, game_setting.role_num_map, self.prob)
+        self.opponent_model.start_game(game_info.agent_list)
+        self.calibration.start_game()
 
+    def init_belief(self, known: Dict[Agent, Role]) -> None:
+        """Set the belief matrix to the priors implied by the role composition of the game.
+
+        Args:
+            known: Agents whose roles are known (myself, and my allies if I am a werewolf).
+        """
+        agent_list: List[Agent] = self.game_info.agent_list
+        remaining: Dict[Role, int] = {r: self.game_setting.role_num_map.get(r, 0) for r in self.role_list}
+        for role in known.values():
+            if role in remaining:
+                remaining[role] -= 1
+        unknown: int = len(agent_list) - len(known)
+        prior: List[float] = [max(remaining[r], 0) / unknown if unknown > 0 else 0.0 for r in self.role_list]
+        self.prob = pd.DataFrame(np.tile(prior, (len(agent_list), 1)), index=agent_list,
+                                 columns=self.role_list, dtype=float)
+        for agent, role in known.items():
+            self.prob.loc[agent] = 0.0
+            if role in self.role_list:
+                self.prob.at[agent, role] = 1.0
+
+    def cached(self, name: str, compute: Callable[[], Any], *extra: Hashable) -> Any:
+        """Return compute() evaluated once per decision-relevant state.
+
+        Args:
+            name: The name of the evaluation.
+            compute: Function of the comingouts, divination reports, alive agents and strong vote
+                (and of extra). The returned value must not be modified by the caller.
+            extra: Other inputs of compute.
+
+        Returns:
+            The evaluation.
+        """
+        return self.decision_cache.get((name, self.state_hash.value) + extra, compute)
+
+    def refresh_strong_agents(self) -> None:
+        """Choose the strongest other agents on each side according to the skill ratings."""
+        others: List[Agent] = self.get_others(self.game_info.agent_list)
+        self.strong_agent_v = self.ratings.strongest(VILLAGERS, others)
+        self.strong_agent_w = self.ratings.strongest(WEREWOLVES, others)
 
     def day_start(self) -> None:
+        self.refresh_strong_agents()
         self.talk_list_head = 0
         self.vote_candidate = AGENT_NONE
+        if self.strong_vote:
+            self.state_hash.remove(("strong", self.strong_vote[-1]))
         self.strong_vote = []
         #self.strong_vote_w = []
+        if self.game_info.executed_agent is not None:
+            self.constraint.executed_agent(self.game_info.executed_agent)
+            self.opponent_model.died(self.game_info.executed_agent, False)
+        for agent in self.game_info.last_dead_agent_list:
+            self.constraint.attacked(agent)
+            self.opponent_model.died(agent, True)
         for agent in self.game_info.agent_list:
-            if agent not in self.get_alive(self.game_info.agent_list):
+            if not self.is_alive(agent):
                 #logger.debug(agent)
                 #logger.debug(self.prob.loc[agent])
                 self.prob.loc[agent] = np.nan
-            
-    def update(self, game_info: GameInfo, w_p, v_p, countflag) -> None:
+
+    def update(self, game_info: GameInfo) -> None:
         if self.first_updateflag == 1:
             self.first_updateflag *= 0
-            #logger.debug(f'wp {w_p}')
-            #logger.debug(f'vp {v_p}')
-            self.strong_agent_v = v_p["villagers_win"].idxmax()
-            self.strong_agent_w = w_p["werewolves_win"].idxmax()
+            self.refresh_strong_agents()
         self.game_info = game_info  # Update game information.
+        for agent, status in game_info.status_map.items():
+            if status != Status.ALIVE:
+                self.state_hash.add(("dead", agent))
         """ logger.debug('update')
         logger.debug(f'me {self.game_info.me}')
         logger.debug(f'day {self.game_info.day}')
@@ -189,36 +261,48 @@ class SampleVillager(AbstractPlayer):
             if talker == self.me:  # Skip my talk.
                 continue
             content: Content = Content.compile(tk.text)
+            self.opponent_model.observe(talker, tk.day, content)
+            self.observe_talk(talker, content)
             if content.topic == Topic.COMINGOUT:
+                if talker in self.comingout_map:
+                    self.state_hash.remove(("co", talker, self.comingout_map[talker]))
+                self.state_hash.add(("co", talker, content.role))
                 self.comingout_map[talker] = content.role
+                # Only a comingout about the talker itself is its own claim.
+                if content.target == talker:
+                    self.constraint.comingout(talker, content.role)
             elif content.topic == Topic.DIVINED:
                 self.divination_reports.append(Judge(talker, game_info.day, content.target, content.result))
+                self.constraint.divined(self.divination_reports[-1])
+                self.state_hash.add(("div", talker, content.target, content.result))
             elif content.topic == Topic.IDENTIFIED:
                 self.identification_reports.append(Judge(talker, game_info.day, content.target, content.result))
+                self.constraint.identified(self.identification_reports[-1])
             #elif content.topic == Topic.OPERATOR:
                 #self.strong_agent = talker
                 #logger.debug(f'strong agent {self.strong_agent}')
             elif content.topic == Topic.VOTE:
                 if content.subject == self.strong_agent_v:
+                    if self.strong_vote:
+                        self.state_hash.remove(("strong", self.strong_vote[-1]))
+                    self.state_hash.add(("strong", content.target))
                     self.strong_vote.append(content.target)
                 #elif content.subject == self.strong_agent_w:
                     #self.strong_vote_w.append(content.target)
         self.talk_list_head = len(game_info.talk_list)  # All done.
 
+    def observe_talk(self, talker: Agent, content: Content) -> None:
+        """Analyze a talk of another agent (for the roles that need more than the common analysis)."""
+        pass
+
     def talk(self) -> Content:
         #logger.debug(f'candidate {self.vote_candidate}')
         # Choose an agent to be voted for while talking.
         #
-        # The list of fake seers that reported me as a werewolf.
-        self.fake_seers: List[Agent] = [j.agent for j in self.divination_reports
-                                   if j.target == self.me and j.result == Species.WEREWOLF]
-        # Vote for one of the alive agents that were judged as werewolves by non-fake seers.
-        self.reported_wolves: List[Agent] = [j.target for j in self.divination_reports
-                                        if j.agent not in self.fake_seers and j.result == Species.WEREWOLF]
-        candidates: List[Agent] = self.get_alive_others(self.fake_seers)
+        self.fake_seers, self.reported_wolves, candidates = self.cached("villager_vote", self.vote_candidates)
         #logger.debug(candidates)
         for candidate in candidates:
-            self.prob.at[candidate, Role.WEREWOLF] = 0.8
+            self.prob.at[candidate, Role.WEREWOLF] = self.params.fake_seer_target_wolf_belief
             self.vote_candidate = candidate
         
         if self.my_role == Role.VILLAGER:
@@ -233,12 +317,28 @@ class SampleVillager(AbstractPlayer):
                 self.vote_candidate = self.vote_candidate[0] """
             if self.strong_vote:
                 self.vote_candidate = self.strong_vote[-1]
+            elif self.opponent_model.trained:
+                # Vote for the agent that behaves most like a werewolf in past games.
+                others: List[Agent] = self.get_alive_others(self.game_info.agent_list)
+                if others:
+                    self.vote_candidate = self.opponent_model.most_likely_wolf(others)
             else:
                 self.vote_candite = self.strong_agent_w
             if self.vote_candidate != AGENT_NONE:
                 return Content(VoteContentBuilder(self.vote_candidate))
         return CONTENT_SKIP
 
+    def vote_candidates(self) -> tuple:
+        """Return the fake seers, the reported werewolves and the candidates for voting."""
+        # The list of fake seers that reported me as a werewolf.
+        fake_seers: List[Agent] = [j.agent for j in self.divination_reports
+                                   if j.target == self.me and j.result == Species.WEREWOLF]
+        # Vote for one of the alive agents that were judged as werewolves by non-fake seers.
+        reported_wolves: List[Agent] = [j.target for j in self.divination_reports
+                                        if j.agent not in fake_seers and j.result == Species.WEREWOLF]
+        candidates: List[Agent] = self.get_alive_others(fake_seers)
+        return fake_seers, reported_wolves, candidates
+
     def vote(self) -> Agent:
         if self.vote_candidate == AGENT_NONE:
             if self.strong_vote:
@@ -262,7 +362,6 @@ class SampleVillager(AbstractPlayer):
     def whisper(self) -> Content:
         raise NotImplementedError()
 
-    def finish(self,w_win,v_win,w_p,v_p, countflag) -> None:
-        self.w_win = w_win
-        self.v_win = v_win
-        self.countflag = countflag
+    def finish(self) -> None:
+        self.opponent_model.fit(self.game_info.role_map, [self.me])
+        self.calibration.score(self.game_info.role_map, [self.me])
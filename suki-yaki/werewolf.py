@@ -15,26 +15,42 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import random
-from typing import List
+from collections import Counter
+from typing import Dict, List
 
 from aiwolf import (Agent, AttackContentBuilder, ComingoutContentBuilder,
-                    Content, GameInfo, GameSetting, Judge, Role, Species)
+                    Content, GameInfo, GameSetting, Role, Talk, Topic)
 from aiwolf.constant import AGENT_NONE
 
-from const import CONTENT_SKIP, JUDGE_EMPTY
+from const import CONTENT_SKIP
 from possessed import SamplePossessed
 
 
 class SampleWerewolf(SamplePossessed):
     """Sample werewolf agent."""
 
+    policy_actor: str = "werewolf"
+    """Actor of the policy tables."""
     allies: List[Agent]
     """Allies."""
     humans: List[Agent]
     """Humans."""
     attack_vote_candidate: Agent
     """The candidate for the attack voting."""
+    whisper_list_head: int
+    """Index of the whisper to be analysed next."""
+    ally_targets: Dict[Agent, Agent]
+    """The latest attack target declared by each werewolf (including me) today."""
+    ally_fake_roles: Dict[Agent, Role]
+    """Fake roles declared by the allies."""
+    attack_tally: Counter
+    """The number of werewolves declaring each target."""
+    consensus: Agent
+    """The target declared by the most werewolves (the lowest agent index in a tie)."""
+    has_whispered_co: bool
+    """Whether or not the fake role has been declared to the allies."""
+    follow_consensus: bool
+    """Whether to adopt the consensus target (and to avoid fake roles taken by the allies)."""
 
     def __init__(self) -> None:
         """Initialize a new instance of SampleWerewolf."""
@@ -42,63 +58,98 @@ class SampleWerewolf(SamplePossessed):
         self.allies = []
         self.humans = []
         self.attack_vote_candidate = AGENT_NONE
+        self.whisper_list_head = 0
+        self.ally_targets = {}
+        self.ally_fake_roles = {}
+        self.attack_tally = Counter()
+        self.consensus = AGENT_NONE
+        self.has_whispered_co = False
+        self.follow_consensus = True
 
     def initialize(self, game_info: GameInfo, game_setting: GameSetting) -> None:
         super().initialize(game_info, game_setting)
         self.allies = list(self.game_info.role_map.keys())
         self.humans = [a for a in self.game_info.agent_list if a not in self.allies]
-        for ally in self.allies:
-            self.prob.at[ally, Role.WEREWOLF] = 1
-            for role in self.role_list:
-                if role != Role.WEREWOLF:
-                    self.prob.at[ally, role] = 0
-        for human in self.humans:
-            self.prob += 1.0 / 12 # WEREWOLFの確率を他の役職に平等に足した
-            self.prob.at[human, Role.WEREWOLF] = 0
-        # Do comingout on the day that randomly selected from the 1st, 2nd and 3rd day.
-        # Choose fake role randomly.
-        if len(self.game_info.agent_list) == 5:
-            self.fake_role = Role.VILLAGER
-        else:
-            self.fake_role = random.choice([r for r in [Role.VILLAGER, Role.SEER]
-                                            if r in self.game_info.existing_role_list])
-
-    def get_fake_judge(self) -> Judge:
-        """Generate a fake judgement."""
-        # Determine the target of the fake judgement.
-        target: Agent = AGENT_NONE
-        if self.fake_role == Role.SEER:  # Fake seer chooses a target randomly.
-            if self.game_info.day != 0:
-                target = self.random_select(self.get_alive(self.not_judged_agents))
-        elif self.fake_role == Role.MEDIUM:
-            target = self.game_info.executed_agent if self.game_info.executed_agent is not None \
-                else AGENT_NONE
-        if target == AGENT_NONE:
-            return JUDGE_EMPTY
-        # Determine a fake result.
-        # If the target is a human
-        # and the number of werewolves found is less than the total number of werewolves,
-        # judge as a werewolf with a probability of 0.3.
-        result: Species = Species.WEREWOLF if target in self.humans \
-            and len(self.werewolves) < self.num_wolves and random.random() < 0.3 \
-            else Species.HUMAN
-        return Judge(self.me, self.game_info.day, target, result)
+        self.whisper_list_head = 0
+        self.has_whispered_co = False
+        self.ally_fake_roles.clear()
+        self.clear_consensus()
+
+    def clear_consensus(self) -> None:
+        """Forget the attack targets declared so far."""
+        self.ally_targets.clear()
+        self.attack_tally.clear()
+        self.consensus = AGENT_NONE
+
+    def declare(self, agent: Agent, target: Agent) -> None:
+        """Update the tally with the attack target declared by a werewolf."""
+        previous: Agent = self.ally_targets.get(agent, AGENT_NONE)
+        if previous == target:
+            return
+        self.ally_targets[agent] = target
+        self.attack_tally[target] += 1
+        if previous != AGENT_NONE:
+            self.attack_tally[previous] -= 1
+        if self.consensus == AGENT_NONE or self.ranks_above(target, self.consensus):
+            self.consensus = target
+        elif previous == self.consensus:
+            # The leader lost a vote. Rescanning is bounded by the number of werewolves.
+            for t in self.ally_targets.values():
+                if self.ranks_above(t, self.consensus):
+                    self.consensus = t
+
+    def ranks_above(self, a: Agent, b: Agent) -> bool:
+        """Return whether a has more declarations than b, breaking a tie by the lower agent index.
+
+        Every werewolf sees the same whispers, so they all rank the targets alike.
+        """
+        return (self.attack_tally[a], -a.agent_idx) > (self.attack_tally[b], -b.agent_idx)
+
+    def update(self, game_info: GameInfo) -> None:
+        super().update(game_info)
+        for i in range(self.whisper_list_head, len(game_info.whisper_list)):  # Analyze new whispers.
+            wh: Talk = game_info.whisper_list[i]
+            content: Content = Content.compile(wh.text)
+            if content.topic == Topic.ATTACK:
+                self.declare(wh.agent, content.target)
+            elif content.topic == Topic.COMINGOUT and wh.agent != self.me:
+                self.ally_fake_roles[wh.agent] = content.role
+        self.whisper_list_head = len(game_info.whisper_list)
+
+    def likely_wolves(self) -> List[Agent]:
+        return self.get_alive_others(self.allies)
+
+    def observe_talk(self, talker: Agent, content: Content) -> None:
+        pass  # The werewolves are known.
 
     def day_start(self) -> None:
         super().day_start()
         self.attack_vote_candidate = AGENT_NONE
+        self.whisper_list_head = 0
+        self.clear_consensus()
 
     def whisper(self) -> Content:
         # Declare the fake role on the 1st day,
         # and declare the target of attack vote after that.
         if self.game_info.day == 0:
+            # Leave the fake seer to the ally with the lowest index that declares it,
+            # declaring again if the conflict is found after my declaration.
+            if self.follow_consensus and self.fake_role == Role.SEER \
+                    and any(r == Role.SEER and a.agent_idx < self.me.agent_idx
+                            for a, r in self.ally_fake_roles.items()):
+                self.fake_role = Role.VILLAGER
+                self.policy.claim(self.policy_actor, len(self.game_info.agent_list), self.fake_role)
+                self.has_whispered_co = False
+            if self.has_whispered_co:
+                return CONTENT_SKIP
+            self.has_whispered_co = True
             return Content(ComingoutContentBuilder(self.me, self.fake_role))
         # Choose the target of attack vote.
-        # Vote for one of the agent that did comingout.
-        candidates = [a for a in self.get_alive(self.humans) if a in self.comingout_map]
-        # Vote for one of the alive human agents if there are no candidates.
-        if not candidates:
-            candidates = self.get_alive(self.humans)
+        candidates: List[Agent] = self.cached("attack", self.attack_candidates)
+        # Follow the target declared by the most allies.
+        if self.follow_consensus and self.consensus in candidates and self.consensus != self.attack_vote_candidate:
+            self.attack_vote_candidate = self.consensus
+            return Content(AttackContentBuilder(self.attack_vote_candidate))
         # Declare which to vote for if not declare yet or the candidate is changed.
         if self.attack_vote_candidate == AGENT_NONE or self.attack_vote_candidate not in candidates:
             if candidates:
@@ -109,5 +160,16 @@ class SampleWerewolf(SamplePossessed):
                 return Content(AttackContentBuilder(self.attack_vote_candidate))
         return CONTENT_SKIP
 
+    def attack_candidates(self) -> List[Agent]:
+        """Return the candidates for attack vote."""
+        # Vote for one of the agent that did comingout.
+        candidates: List[Agent] = [a for a in self.get_alive(self.humans) if a in self.comingout_map]
+        # Vote for one of the alive human agents if there are no candidates.
+        if not candidates:
+            candidates = self.get_alive(self.humans)
+        return candidates
+
     def attack(self) -> Agent:
+        if self.follow_consensus and self.consensus in self.humans and self.is_alive(self.consensus):
+            return self.consensus
         return self.attack_vote_candidate if self.attack_vote_candidate != AGENT_NONE else self.me
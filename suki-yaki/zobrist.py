@@ -0,0 +1,126 @@
+#
+# zobrist.py
+#
+# Copyright 2022 OTSUKI Takashi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Set
+
+
+class ZobristHash:
+    """Incremental hash of a set of features.
+
+    Each feature is assigned a random 64-bit key, and the hash is the XOR of the keys of
+    the features present. Adding or removing a feature costs O(1), and the same set of
+    features reached in a different order gives the same hash.
+    """
+
+    value: int
+    """The current hash."""
+
+    _keys: Dict[Hashable, int] = {}
+    _rng: random.Random = random.Random(0x5EED)
+
+    def __init__(self) -> None:
+        """Initialize a new instance of ZobristHash."""
+        self.value = 0
+        self._present: Set[Hashable] = set()
+
+    def clear(self) -> None:
+        """Remove all features."""
+        self.value = 0
+        self._present.clear()
+
+    def add(self, feature: Hashable) -> None:
+        """Add a feature if not present."""
+        if feature not in self._present:
+            self._present.add(feature)
+            self.value ^= self._key(feature)
+
+    def remove(self, feature: Hashable) -> None:
+        """Remove a feature if present."""
+        if feature in self._present:
+            self._present.remove(feature)
+            self.value ^= self._key(feature)
+
+    def __contains__(self, feature: Hashable) -> bool:
+        return feature in self._present
+
+    @classmethod
+    def _key(cls, feature: Hashable) -> int:
+        key = cls._keys.get(feature)
+        if key is None:
+            key = cls._keys[feature] = cls._rng.getrandbits(64)
+        return key
+
+
+class DecisionCache:
+    """Bounded LRU cache of decision evaluations keyed by state hash."""
+
+    max_size: int
+    """The maximum number of entries."""
+    hits: int
+    """The number of lookups answered from the cache since the last clear."""
+    misses: int
+    """The number of lookups evaluated since the last clear."""
+
+    def __init__(self, max_size: int = 256) -> None:
+        """Initialize a new instance of DecisionCache.
+
+        Args:
+            max_size: The maximum number of entries.
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of lookups answered from the cache."""
+        total: int = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    def get(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached evaluation for the key, computing it if missing.
+
+        Args:
+            key: The state key (including the hash and the name of the decision).
+            compute: Function evaluating the decision.
+
+        Returns:
+            The evaluation.
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+        self.misses += 1
+        value: Any = compute()
+        self._entries[key] = value
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        """Remove all entries and reset the metrics, so that they count a single game."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def metrics(self) -> Dict[str, float]:
+        """Return the hit/miss counters and the hit rate."""
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": round(self.hit_rate, 4)}